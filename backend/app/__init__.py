@@ -21,6 +21,10 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
+    # orjson when installed, stdlib json otherwise; both write ISO dates
+    from .utils.json_provider import QuickDocJSONProvider
+    app.json = QuickDocJSONProvider(app)
+
     # 2) Enable CORS globally
     CORS(
         app,
@@ -28,9 +32,15 @@ def create_app():
         supports_credentials=True,
         allow_headers=["Content-Type", "Authorization"],
         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        expose_headers=["X-Next-Cursor", "ETag"],
     )
 
     # 3) Initialize extensions
+    if "pool_size" in app.config["SQLALCHEMY_ENGINE_OPTIONS"]:
+        # time pool checkouts for /api/admin/metrics
+        from .services.metrics_service import instrument_engine_options
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = instrument_engine_options(
+            app.config["SQLALCHEMY_ENGINE_OPTIONS"])
     db.init_app(app)
     jwt.init_app(app)
     mail.init_app(app)
@@ -42,8 +52,15 @@ def create_app():
     from .models.slot              import Slot
     from .models.booking           import Booking
     from .models.standby           import StandbyPreference
+    from .models.standby_index     import StandbyIndexEntry
     from .models.dnd               import DNDPreference
     from .models.slot_confirmation import SlotConfirmation  # ← import new model
+    from .models.notification_job  import NotificationJob
+    from .models.notification_counter import NotificationCounter
+
+    # Per-endpoint latency, status and SQL metrics; slow-request log
+    from .services.metrics_service import init_request_metrics
+    init_request_metrics(app)
 
     # 5) Register blueprints
     from .routes.auth     import auth_bp
@@ -69,6 +86,11 @@ def create_app():
     def index():
         return {"message": "QuickDoc API is running."}, 200
 
+    # 6) Optional in-process maintenance (slot expiry, token purge)
+    if app.config["MAINTENANCE_SCHEDULER_ENABLED"] and not app.testing:
+        from .services.maintenance_service import start_maintenance_scheduler
+        start_maintenance_scheduler(app)
+
     return app
 
 
@@ -17,6 +17,28 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Connection pool and per-statement timeout (Postgres; SQLite keeps its own pool)
+    DB_POOL_SIZE            = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW         = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT         = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE         = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING        = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("true", "1")
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 30000))   # 0 disables
+
+    SQLALCHEMY_ENGINE_OPTIONS = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if SQLALCHEMY_DATABASE_URI.startswith("postgres"):
+        SQLALCHEMY_ENGINE_OPTIONS.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+        if DB_STATEMENT_TIMEOUT_MS > 0:
+            # set on every new connection, so it also covers the workers
+            SQLALCHEMY_ENGINE_OPTIONS["connect_args"] = {
+                "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+            }
+
     # JWT configuration
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "jwtsecret")
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(
@@ -50,6 +72,83 @@ class Config:
     NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", 10))
     DEFAULT_TIMEZONE        = os.getenv("DEFAULT_TIMEZONE", "Europe/Berlin")
 
+    # Password hashing (Werkzeug method string). Hashes stored with other
+    # parameters are upgraded on the next successful login.
+    PASSWORD_HASH_METHOD      = os.getenv("PASSWORD_HASH_METHOD", "pbkdf2:sha256:600000")
+    PASSWORD_SALT_LENGTH      = int(os.getenv("PASSWORD_SALT_LENGTH", 16))
+    # Hashing runs on a bounded pool; callers beyond the queue wait at most
+    # PASSWORD_HASH_WAIT_SECONDS for a place and then get a 503
+    PASSWORD_HASH_WORKERS      = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+    PASSWORD_HASH_QUEUE_SIZE   = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", 32))
+    PASSWORD_HASH_WAIT_SECONDS = float(os.getenv("PASSWORD_HASH_WAIT_SECONDS", 2))
+
+    # Authenticated user rows are cached per process for this long
+    # (never longer than an access token lives); 0 disables the cache
+    USER_CACHE_SECONDS     = int(os.getenv("USER_CACHE_SECONDS", 60))
+    USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", 10000))
+
+    # Serialize responses with orjson when it is installed
+    JSON_USE_ORJSON = os.getenv("JSON_USE_ORJSON", "true").lower() in ("true", "1")
+
+    # Large list endpoints stream their JSON, fetching this many rows at a time
+    STREAM_YIELD_PER = int(os.getenv("STREAM_YIELD_PER", 1000))
+
+    # Request metrics (GET /api/admin/metrics): requests slower than this are
+    # logged with up to SLOW_REQUEST_MAX_STATEMENTS of their SQL; 0 disables the log
+    SLOW_REQUEST_MS             = int(os.getenv("SLOW_REQUEST_MS", 1000))
+    SLOW_REQUEST_MAX_STATEMENTS = int(os.getenv("SLOW_REQUEST_MAX_STATEMENTS", 50))
+
+    # N+1 query detection for development and tests: "off", "log" or "raise"
+    # when the same SELECT runs NPLUSONE_THRESHOLD times within one request
+    NPLUSONE_DETECTION = os.getenv("NPLUSONE_DETECTION", "off").lower()
+    NPLUSONE_THRESHOLD = int(os.getenv("NPLUSONE_THRESHOLD", 5))
+
+    # Admin dashboard counters are cached per process for this long
+    ADMIN_STATS_CACHE_SECONDS = int(os.getenv("ADMIN_STATS_CACHE_SECONDS", 15))
+
+    # Recurring schedule generation (POST /api/clinic/doctors/<id>/schedule)
+    SCHEDULE_MAX_DAYS         = int(os.getenv("SCHEDULE_MAX_DAYS", 366))
+    SCHEDULE_MAX_SLOTS        = int(os.getenv("SCHEDULE_MAX_SLOTS", 5000))
+    SCHEDULE_DIGEST_MAX_SLOTS = int(os.getenv("SCHEDULE_DIGEST_MAX_SLOTS", 5))
+
+    # Patient slot search pagination (GET /api/patient/slots)
+    SLOT_SEARCH_PAGE_SIZE     = int(os.getenv("SLOT_SEARCH_PAGE_SIZE", 50))
+    SLOT_SEARCH_MAX_PAGE_SIZE = int(os.getenv("SLOT_SEARCH_MAX_PAGE_SIZE", 200))
+
+    # Slot facet counts (GET /api/patient/slots/facets), cached per process
+    # for this long per distinct set of filters
+    SLOT_FACETS_CACHE_SECONDS     = int(os.getenv("SLOT_FACETS_CACHE_SECONDS", 5))
+    SLOT_FACETS_CACHE_MAX_ENTRIES = int(os.getenv("SLOT_FACETS_CACHE_MAX_ENTRIES", 1000))
+
+    # Live slot stream (GET /api/patient/slots/stream): idle connections get a
+    # heartbeat this often; a client more than SLOT_STREAM_QUEUE_SIZE events
+    # behind is reset; at most SLOT_STREAM_MAX_SUBSCRIBERS per process (keep it
+    # below gunicorn's worker_connections; under `flask run` each is a thread)
+    SLOT_STREAM_HEARTBEAT_SECONDS = int(os.getenv("SLOT_STREAM_HEARTBEAT_SECONDS", 15))
+    SLOT_STREAM_QUEUE_SIZE        = int(os.getenv("SLOT_STREAM_QUEUE_SIZE", 100))
+    SLOT_STREAM_MAX_SUBSCRIBERS   = int(os.getenv("SLOT_STREAM_MAX_SUBSCRIBERS", 5000))
+
+    # Email standby patients whose confirmation link died because someone
+    # else booked the slot (one batched outbox job per booking)
+    SLOT_TAKEN_NOTICES_ENABLED = os.getenv("SLOT_TAKEN_NOTICES_ENABLED", "true").lower() in ("true", "1")
+
+    # Notification outbox worker (flask notify-worker)
+    NOTIFY_WORKER_POLL_SECONDS   = float(os.getenv("NOTIFY_WORKER_POLL_SECONDS", 2))
+    NOTIFY_WORKER_BATCH_SIZE     = int(os.getenv("NOTIFY_WORKER_BATCH_SIZE", 20))
+    NOTIFY_MAX_ATTEMPTS          = int(os.getenv("NOTIFY_MAX_ATTEMPTS", 5))
+    NOTIFY_RETRY_BASE_SECONDS    = int(os.getenv("NOTIFY_RETRY_BASE_SECONDS", 30))
+    NOTIFY_RETRY_MAX_SECONDS     = int(os.getenv("NOTIFY_RETRY_MAX_SECONDS", 3600))
+    NOTIFY_LOCK_TIMEOUT_SECONDS  = int(os.getenv("NOTIFY_LOCK_TIMEOUT_SECONDS", 600))
+
+    # Periodic maintenance (flask maintenance, or the in-process scheduler)
+    MAINTENANCE_SCHEDULER_ENABLED = os.getenv("MAINTENANCE_SCHEDULER_ENABLED", "false").lower() in ("true", "1")
+    MAINTENANCE_INTERVAL_SECONDS  = int(os.getenv("MAINTENANCE_INTERVAL_SECONDS", 300))
+    TOKEN_PURGE_BATCH_SIZE        = int(os.getenv("TOKEN_PURGE_BATCH_SIZE", 1000))
+    TOKEN_PURGE_MAX_BATCHES       = int(os.getenv("TOKEN_PURGE_MAX_BATCHES", 50))
+    # confirmation tokens are kept this long after they expire, so old links
+    # still answer "booked" / "taken" instead of "invalid"
+    TOKEN_RETENTION_HOURS         = int(os.getenv("TOKEN_RETENTION_HOURS", 168))
+
     # Admin default credentials (used for seeding)
     ADMIN_EMAIL    = os.getenv("ADMIN_EMAIL", "admin@quickdoc.com")
     ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin123")
@@ -1,6 +1,7 @@
 from app import create_app, db
 from flask.cli import with_appcontext
 import click
+import time
 
 # Create app instance
 app = create_app()
@@ -30,10 +31,148 @@ def seed_data():
     run_seed()
     click.echo("🌱 Database seeded with sample data.")
 
+# CLI command: rebuild the standby matching index and compiled time windows
+@click.command(name="reindex-standby")
+@with_appcontext
+def reindex_standby():
+    """Rebuild the standby matching index and compiled standby/DND windows."""
+    from app.services.standby_service import rebuild_standby_index
+    count = rebuild_standby_index()
+    click.echo(f"🔎 Indexed {count} standby preferences.")
+
+# CLI command: drain the notification outbox
+@click.command(name="notify-worker")
+@click.option("--once", is_flag=True, help="Process one batch and exit.")
+@click.option("--batch-size", type=int, default=None, help="Jobs claimed per batch.")
+@with_appcontext
+def notify_worker(once, batch_size):
+    """Send queued standby notifications, retrying failed jobs with backoff."""
+    from flask import current_app
+    from app.services.outbox_service import process_outbox
+    poll = current_app.config["NOTIFY_WORKER_POLL_SECONDS"]
+
+    click.echo("📬 Notification worker started.")
+    while True:
+        result = process_outbox(batch_size)
+        if any(result.values()):
+            click.echo(f"📨 done={result['done']} retried={result['retried']} dead={result['dead']}")
+        if once:
+            break
+        # keep draining while there is a backlog, otherwise wait for new jobs
+        if not any(result.values()):
+            time.sleep(poll)
+
+# CLI command: periodic maintenance (slot expiry, token purge)
+@click.command(name="maintenance")
+@click.option("--loop", is_flag=True, help="Keep running every MAINTENANCE_INTERVAL_SECONDS.")
+@with_appcontext
+def maintenance(loop):
+    """Expire past open slots, purge used/expired confirmation tokens and old notification counters."""
+    from flask import current_app
+    from app.services.maintenance_service import run_maintenance
+    interval = current_app.config["MAINTENANCE_INTERVAL_SECONDS"]
+
+    while True:
+        result = run_maintenance()
+        click.echo(f"🧹 expired_slots={result['expired_slots']} "
+                   f"purged_tokens={result['purged_tokens']} "
+                   f"purged_counters={result['purged_counters']}")
+        if not loop:
+            break
+        time.sleep(interval)
+
+# CLI command: password hashing benchmark at the configured settings
+@click.command(name="bench-login")
+@click.option("--seconds", type=float, default=5.0, help="Duration of each measurement.")
+@click.option("--clients", type=int, default=None, help="Concurrent callers (default: 4 x workers).")
+@with_appcontext
+def bench_login(seconds, clients):
+    """Measure password verifications per second, single-core and through the pool."""
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+    from flask import current_app
+    from werkzeug.security import check_password_hash
+    from app.services.auth_service import hash_password, run_password_hashing
+
+    app_ = current_app._get_current_object()
+    hashed = hash_password("benchmark-password")
+    workers = app_.config["PASSWORD_HASH_WORKERS"]
+    clients = clients or 4 * workers
+
+    def measure(fn):
+        done, deadline = 0, time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            fn()
+            done += 1
+        return done
+
+    started = time.perf_counter()
+    single = measure(lambda: check_password_hash(hashed, "benchmark-password"))
+    per_core = single / (time.perf_counter() - started)
+
+    def pooled_client():
+        with app_.app_context():
+            return measure(lambda: run_password_hashing(
+                check_password_hash, hashed, "benchmark-password"))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as callers:
+        total = sum(callers.map(lambda _: pooled_client(), range(clients)))
+    pooled = total / (time.perf_counter() - started)
+
+    click.echo(f"🔐 method={app_.config['PASSWORD_HASH_METHOD']} cpus={os.cpu_count()} "
+               f"workers={workers} clients={clients}")
+    click.echo(f"   per core: {per_core:.1f} logins/s ({1000 / per_core:.1f} ms each)")
+    click.echo(f"   pooled:   {pooled:.1f} logins/s")
+
+# CLI command: JSON serialization benchmark for slot listings
+@click.command(name="bench-json")
+@click.option("--rows", type=int, default=10000, help="Number of slots to serialize.")
+@click.option("--repeat", type=int, default=5, help="Runs per measurement (best is reported).")
+@with_appcontext
+def bench_json(rows, repeat):
+    """Time to_dict() and JSON encoding of in-memory slots (no database)."""
+    from datetime import date, datetime, time as dtime, timedelta
+    from flask import current_app
+    from app.models.slot import Slot
+    from app.models.doctor import Doctor
+
+    doctor = Doctor(id=1, clinic_id=1, name="Dr. Bench")
+    now = datetime.utcnow()
+    slots = [
+        Slot(id=i, clinic_id=1, doctor_id=1, doctor=doctor,
+             date=date.today() + timedelta(days=i % 90),
+             start_time=dtime(8 + i % 9), end_time=dtime(9 + i % 9),
+             language="English", specialization="General", status="open",
+             created_at=now, updated_at=now)
+        for i in range(rows)
+    ]
+    dicts = [s.to_dict() for s in slots]
+
+    def best(fn):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return min(timings) * 1000
+
+    provider = current_app.json
+    engine = "orjson" if getattr(provider, "use_orjson", False) else "stdlib json"
+    click.echo(f"🧾 {rows} slots, provider={type(provider).__name__} ({engine})")
+    click.echo(f"   to_dict:        {best(lambda: [s.to_dict() for s in slots]):.1f} ms")
+    click.echo(f"   dumps:          {best(lambda: provider.dumps(dicts)):.1f} ms")
+    click.echo(f"   full response:  {best(lambda: provider.response([s.to_dict() for s in slots]).get_data()):.1f} ms")
+
 # Register custom CLI commands
 app.cli.add_command(create_db)
 app.cli.add_command(drop_db)
 app.cli.add_command(seed_data)
+app.cli.add_command(reindex_standby)
+app.cli.add_command(notify_worker)
+app.cli.add_command(maintenance)
+app.cli.add_command(bench_login)
+app.cli.add_command(bench_json)
 
 # Main entry point (optional for direct script use)
 if __name__ == "__main__":
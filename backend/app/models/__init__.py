@@ -5,7 +5,10 @@ from .user import User, Patient, Clinic, Admin
 from .slot import Slot
 from .booking import Booking
 from .standby import StandbyPreference
+from .standby_index import StandbyIndexEntry
 from .dnd import DNDPreference
+from .notification_job import NotificationJob
+from .notification_counter import NotificationCounter
 
 # This file ensures that when `db.create_all()` is run,
 # all models are recognized by SQLAlchemy.
@@ -8,7 +8,7 @@ class Booking(db.Model):
     __tablename__ = 'bookings'
 
     id = db.Column(db.Integer, primary_key=True)
-    patient_id = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False)
+    patient_id = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False, index=True)
     slot_id = db.Column(db.Integer, db.ForeignKey('slots.id'), nullable=False, unique=True)
     confirmed_at = db.Column(db.DateTime, default=datetime.utcnow)
     cancelled = db.Column(db.Boolean, default=False)
@@ -23,7 +23,7 @@ class Booking(db.Model):
             "id": self.id,
             "patient_id": self.patient_id,
             "slot_id": self.slot_id,
-            "confirmed_at": self.confirmed_at.isoformat(),
+            "confirmed_at": self.confirmed_at,
             "cancelled": self.cancelled,
-            "cancelled_at": self.cancelled_at.isoformat() if self.cancelled_at else None
+            "cancelled_at": self.cancelled_at
         }
@@ -18,6 +18,11 @@ class DNDPreference(db.Model):
     # e.g., '[{"from": "08:00", "to": "11:00"}, {"from": "21:00", "to": "23:00"}]'
     dnd_time_ranges = db.Column(db.Text, nullable=True)
 
+    # Compiled forms of the two fields above (see utils.time_utils):
+    # weekday bitmask and packed minute-of-day ranges
+    dnd_day_mask = db.Column(db.Integer, nullable=True)
+    dnd_minutes = db.Column(db.LargeBinary, nullable=True)
+
     temporarily_paused = db.Column(db.Boolean, default=False)
     pause_until = db.Column(db.DateTime, nullable=True)
 
@@ -30,7 +35,7 @@ class DNDPreference(db.Model):
             "dnd_days": self.dnd_days.split(',') if self.dnd_days else [],
             "dnd_time_ranges": json.loads(self.dnd_time_ranges or "[]"),
             "temporarily_paused": self.temporarily_paused,
-            "pause_until": self.pause_until.isoformat() if self.pause_until else None,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat()
+            "pause_until": self.pause_until,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
         }
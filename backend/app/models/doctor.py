@@ -10,7 +10,7 @@ class Doctor(db.Model):
     __tablename__ = 'doctors'
 
     id = db.Column(db.Integer, primary_key=True)
-    clinic_id = db.Column(db.Integer, db.ForeignKey('clinics.id'), nullable=False)
+    clinic_id = db.Column(db.Integer, db.ForeignKey('clinics.id'), nullable=False, index=True)
 
     # Basic profile
     name = db.Column(db.String(128), nullable=False)
@@ -21,6 +21,9 @@ class Doctor(db.Model):
     # timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # bumped by every UPDATE; see Slot.version
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1',
+                        onupdate=db.text('version + 1'))
 
     # relationships
     clinic = db.relationship('Clinic', back_populates='doctors')
@@ -38,6 +41,6 @@ class Doctor(db.Model):
             "name": self.name,
             "specialization": self.specialization,
             "languages": self.languages.split(",") if self.languages else [],
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
         }
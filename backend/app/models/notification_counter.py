@@ -0,0 +1,24 @@
+# backend/app/models/notification_counter.py
+
+from app import db
+
+class NotificationCounter(db.Model):
+    """
+    How many standby notification emails a patient has been sent on one
+    (UTC) day. Enforces StandbyPreference.max_notifications_per_day;
+    rows older than yesterday are purged by the maintenance job.
+    """
+    __tablename__ = 'notification_counters'
+
+    patient_id = db.Column(
+        db.Integer,
+        db.ForeignKey('patients.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    day = db.Column(db.Date, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # maintenance purge by day
+        db.Index('ix_notification_counters_day', 'day'),
+    )
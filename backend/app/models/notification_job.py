@@ -0,0 +1,55 @@
+# backend/app/models/notification_job.py
+
+from datetime import datetime
+from app import db
+
+class NotificationJob(db.Model):
+    """
+    Outbox entry for a standby notification fan-out.
+    Written in the same transaction as the slot change that triggers it
+    and drained by the `flask notify-worker` command.
+    """
+    __tablename__ = 'notification_outbox'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(30), nullable=False, default='slot_opened')
+    # 'slot_opened' jobs point at one slot; 'slots_opened' jobs carry a JSON
+    # list of slot ids in `payload` instead; 'slot_taken' jobs point at the
+    # booked slot and carry the JSON list of patients to tell;
+    # 'standby_resend' jobs carry {patient_id: [token, ...]} of offers whose
+    # email failed and must be sent again
+    slot_id = db.Column(
+        db.Integer,
+        db.ForeignKey('slots.id', ondelete='CASCADE'),
+        nullable=True
+    )
+    payload = db.Column(db.Text, nullable=True)
+
+    # possible values: pending, processing, done, dead
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    slot = db.relationship('Slot')
+
+    __table_args__ = (
+        db.Index('ix_notification_outbox_due', 'status', 'next_attempt_at'),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "slot_id": self.slot_id,
+            "status": self.status,
+            "attempts": self.attempts,
+            "next_attempt_at": self.next_attempt_at.isoformat(),
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat()
+        }
@@ -37,6 +37,15 @@ class Slot(db.Model):
         server_default=db.func.now(),
         onupdate=db.func.now()
     )
+    # bumped by every UPDATE, ORM or bulk; list ETags sum it because
+    # updated_at can repeat within one timestamp tick
+    version = db.Column(
+        db.Integer,
+        nullable=False,
+        default=1,
+        server_default='1',
+        onupdate=db.text('version + 1')
+    )
 
     # one-to-one relationship with Booking (a slot may have at most one booking)
     booking = db.relationship(
@@ -60,6 +69,22 @@ class Slot(db.Model):
         cascade='all, delete-orphan'
     )
 
+    __table_args__ = (
+        # patient slot search: open slots in (date, start_time, id) keyset order
+        db.Index(
+            'ix_slots_open_date_start',
+            'date', 'start_time', 'id',
+            postgresql_where=db.text("status = 'open'"),
+            sqlite_where=db.text("status = 'open'")
+        ),
+        # clinic calendars and cancellations, ordered by date
+        db.Index('ix_slots_clinic_date', 'clinic_id', 'date', 'start_time'),
+        # doctor calendars
+        db.Index('ix_slots_clinic_doctor', 'clinic_id', 'doctor_id', 'date', 'start_time'),
+        # status counts and sweeps
+        db.Index('ix_slots_status_date', 'status', 'date'),
+    )
+
     def is_available(self):
         """Returns True if this slot is still open for booking."""
         return self.status == 'open'
@@ -71,14 +96,14 @@ class Slot(db.Model):
         data = {
             "id": self.id,
             "clinic_id": self.clinic_id,
-            "date": self.date.isoformat(),
-            "start_time": self.start_time.strftime('%H:%M'),
-            "end_time": self.end_time.strftime('%H:%M'),
+            "date": self.date,
+            "start_time": self.start_time.isoformat(timespec="minutes"),
+            "end_time": self.end_time.isoformat(timespec="minutes"),
             "language": self.language,
             "specialization": self.specialization,
             "status": self.status,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
         }
         if self.doctor_id:
             data["doctor_id"] = self.doctor_id
@@ -8,10 +8,10 @@ class SlotConfirmation(db.Model):
     token      = db.Column(db.String, primary_key=True,
                            default=lambda: str(uuid.uuid4()))
     slot_id    = db.Column(db.Integer, db.ForeignKey("slots.id"),
-                           nullable=False)
+                           nullable=False, index=True)
     patient_id = db.Column(db.Integer, db.ForeignKey("patients.id"),
                            nullable=False)
-    expires_at = db.Column(db.DateTime, nullable=False,
+    expires_at = db.Column(db.DateTime, nullable=False, index=True,
                            default=lambda: datetime.utcnow() + timedelta(hours=2))
     used       = db.Column(db.Boolean, default=False)
 
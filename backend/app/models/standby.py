@@ -11,18 +11,28 @@ class StandbyPreference(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     patient_id = db.Column(db.Integer, db.ForeignKey('patients.id'), unique=True, nullable=False)
     
-    enabled = db.Column(db.Boolean, default=False)
+    enabled = db.Column(db.Boolean, default=False, index=True)
 
     # Optional filters
     preferred_languages = db.Column(db.String(200), nullable=True)  # CSV e.g. "English,French"
     preferred_days = db.Column(db.String(100), nullable=True)       # CSV e.g. "Monday,Tuesday"
     preferred_times = db.Column(db.String(200), nullable=True)      # JSON string or range, e.g. "08:00-12:00,15:00-18:00"
 
+    # preferred_times compiled to packed minute-of-day ranges (see utils.time_utils)
+    preferred_minutes = db.Column(db.LargeBinary, nullable=True)
+
     max_notifications_per_day = db.Column(db.Integer, default=5)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # (language, hour bucket) keys used to look up candidate patients for a slot
+    index_entries = db.relationship(
+        'StandbyIndexEntry',
+        back_populates='preference',
+        cascade='all, delete-orphan'
+    )
+
     def to_dict(self):
         return {
             "enabled": self.enabled,
@@ -30,6 +40,6 @@ class StandbyPreference(db.Model):
             "preferred_days": self.preferred_days.split(',') if self.preferred_days else [],
             "preferred_times": self.preferred_times,
             "max_notifications_per_day": self.max_notifications_per_day,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat()
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
         }
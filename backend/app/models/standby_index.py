@@ -0,0 +1,27 @@
+# backend/app/models/standby_index.py
+
+from app import db
+
+class StandbyIndexEntry(db.Model):
+    """
+    One key of the standby matching index: a (language, hour-of-day) bucket
+    that a standby preference can match. A NULL language means the
+    preference accepts any slot language.
+    """
+    __tablename__ = 'standby_index'
+
+    id = db.Column(db.Integer, primary_key=True)
+    preference_id = db.Column(
+        db.Integer,
+        db.ForeignKey('standby_preferences.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+    language = db.Column(db.String(50), nullable=True)
+    bucket = db.Column(db.SmallInteger, nullable=False)  # hour of day, 0-23
+
+    preference = db.relationship('StandbyPreference', back_populates='index_entries')
+
+    __table_args__ = (
+        db.Index('ix_standby_index_bucket_language', 'bucket', 'language'),
+    )
@@ -1,5 +1,6 @@
 # backend/app/models/user.py
 
+from flask import current_app
 from app import db
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
@@ -26,7 +27,11 @@ class User(db.Model):
     }
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(
+            password,
+            method=current_app.config["PASSWORD_HASH_METHOD"],
+            salt_length=current_app.config["PASSWORD_SALT_LENGTH"]
+        )
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
@@ -36,7 +41,7 @@ class User(db.Model):
             "id": self.id,
             "email": self.email,
             "role": self.role,
-            "created_at": self.created_at.isoformat()
+            "created_at": self.created_at
         }
 
 
@@ -1,16 +1,18 @@
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, jsonify, Response
+from flask_jwt_extended import jwt_required, get_jwt
 from app.models.user import Admin, Patient, Clinic
-from app.models.slot import Slot
-from app.models.booking import Booking
 from app import db
+from app.services.stats_service import get_dashboard_stats, invalidate_dashboard_stats
+from app.services.auth_service import invalidate_cached_user
+from app.utils.streaming import stream_json_list
+from app.services.metrics_service import render_metrics
 
 admin_bp = Blueprint("admin_bp", __name__)
 
 # Helper to ensure user is admin
 def is_admin():
-    identity = get_jwt_identity()
-    return identity and identity["role"] == "admin"
+    # the role is an additional claim; the identity itself is just the user id
+    return get_jwt().get("role") == "admin"
 
 
 @admin_bp.route("/dashboard", methods=["GET"])
@@ -18,22 +20,26 @@ def is_admin():
 def admin_dashboard():
     """
     Admin dashboard overview with system metrics.
+    Counts may be up to ADMIN_STATS_CACHE_SECONDS old; see `as_of`.
     """
     if not is_admin():
         return jsonify({"error": "Unauthorized"}), 403
 
-    stats = {
-        "total_patients": Patient.query.count(),
-        "total_clinics": Clinic.query.count(),
-        "total_admins": Admin.query.count(),
-        "total_slots": Slot.query.count(),
-        "open_slots": Slot.query.filter_by(status="open").count(),
-        "booked_slots": Slot.query.filter_by(status="booked").count(),
-        "cancelled_slots": Slot.query.filter_by(status="cancelled").count(),
-        "total_bookings": Booking.query.count()
-    }
+    # one aggregate query, cached for ADMIN_STATS_CACHE_SECONDS
+    return jsonify(get_dashboard_stats()), 200
 
-    return jsonify(stats), 200
+
+@admin_bp.route("/metrics", methods=["GET"])
+@jwt_required()
+def request_metrics():
+    """
+    Request latency, status codes and SQL usage per endpoint,
+    in the Prometheus text format. Numbers are per worker process.
+    """
+    if not is_admin():
+        return jsonify({"error": "Unauthorized"}), 403
+
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4"), 200
 
 
 @admin_bp.route("/users/patients", methods=["GET"])
@@ -45,8 +51,8 @@ def list_patients():
     if not is_admin():
         return jsonify({"error": "Unauthorized"}), 403
 
-    patients = Patient.query.all()
-    return jsonify([p.to_dict() for p in patients]), 200
+    # streamed: exports can run to hundreds of thousands of rows
+    return stream_json_list(Patient.query.order_by(Patient.id), Patient.to_dict), 200
 
 
 @admin_bp.route("/users/clinics", methods=["GET"])
@@ -58,8 +64,7 @@ def list_clinics():
     if not is_admin():
         return jsonify({"error": "Unauthorized"}), 403
 
-    clinics = Clinic.query.all()
-    return jsonify([c.to_dict() for c in clinics]), 200
+    return stream_json_list(Clinic.query.order_by(Clinic.id), Clinic.to_dict), 200
 
 
 @admin_bp.route("/users/<role>/<int:user_id>/delete", methods=["DELETE"])
@@ -82,4 +87,6 @@ def delete_user(role, user_id):
 
     db.session.delete(user)
     db.session.commit()
+    invalidate_dashboard_stats()
+    invalidate_cached_user(user_id)
     return jsonify({"message": f"{role.capitalize()} deleted successfully."}), 200
@@ -6,6 +6,9 @@ from app import db
 from app.models.user import User, Patient, Clinic
 from flask_jwt_extended import create_access_token
 from datetime import timedelta
+from app.services.auth_service import (
+    set_user_password, check_user_password, PasswordHasherBusy
+)
 
 auth_bp = Blueprint("auth_bp", __name__, url_prefix="/api/auth")
 
@@ -61,13 +64,16 @@ def register():
         else:
             return jsonify({"error": f"Invalid role '{role}'."}), 400
 
-        # set_password assumed to hash & store
-        user.set_password(password)
+        # hashed on the bounded pool (PASSWORD_HASH_* settings)
+        set_user_password(user, password)
         db.session.add(user)
         db.session.commit()
 
         return jsonify({"message": f"{role.capitalize()} registered successfully."}), 201
 
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+
     except Exception as e:
         # full traceback in container logs
         traceback.print_exc()
@@ -89,7 +95,8 @@ def login():
             return jsonify({"error": "Email and password are required."}), 400
 
         user = User.query.filter_by(email=email).first()
-        if not user or not user.check_password(password):
+        # verified on the bounded pool; outdated hashes are upgraded here
+        if not user or not check_user_password(user, password):
             return jsonify({"error": "Invalid email or password."}), 401
 
         identity_str = str(user.id)
@@ -111,6 +118,9 @@ def login():
             }
         }), 200
 
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+
     except Exception as e:
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
@@ -1,57 +1,69 @@
 # backend/app/routes/clinic.py
 
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import jwt_required
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 from datetime import datetime, time
 
 from app import db
-from app.models.user import Clinic
 from app.models.slot import Slot
 from app.models.booking import Booking
 from app.models.standby import StandbyPreference
 from app.models.dnd import DNDPreference
 from app.models.slot_confirmation import SlotConfirmation
+from app.utils.jwt import current_principal
+from app.utils.etag import query_fingerprint, weak_etag, not_modified, with_etag
+from app.services.slot_service import doctors_version
+from app.utils.streaming import stream_json_list
+from app.services.slot_stream_service import publish_slot_changes
 
-# notification helper
-from app.services.notification_service import notify_standbys_for_slot
+# standby fan-out is queued in the outbox and sent by `flask notify-worker`
+from app.services.outbox_service import enqueue_slot_notification
 
 clinic_bp = Blueprint("clinic_bp", __name__, url_prefix="/api/clinic")
 
 
-def get_current_clinic():
-    claims = get_jwt()
-    if claims.get("role") != "clinic":
-        return None
-    return Clinic.query.get(get_jwt_identity())
+def current_clinic_id():
+    """
+    The logged-in clinic's id, straight from the token (no query), or None.
+    """
+    principal = current_principal()
+    return principal.id if principal.role == "clinic" else None
 
 
 @clinic_bp.route("/slots", methods=["GET"])
 @jwt_required()
 def list_slots():
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
+    query = Slot.query.filter_by(clinic_id=clinic_id)
+    etag = weak_etag(clinic_id, query_fingerprint(query, Slot, doctors_version(clinic_id)))
+    unchanged = not_modified(etag)
+    if unchanged:
+        return unchanged
+
     slots = (
-        Slot.query
-        .filter_by(clinic_id=clinic.id)
+        query
+        .options(joinedload(Slot.doctor))
         .order_by(Slot.date, Slot.start_time)
-        .all()
     )
-    return jsonify([s.to_dict() for s in slots]), 200
+    return with_etag(stream_json_list(slots, Slot.to_dict), etag), 200
 
 
 @clinic_bp.route("/slots", methods=["POST"])
 @jwt_required()
 def create_slot():
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
     data = request.get_json() or {}
     try:
         slot = Slot(
-            clinic_id=clinic.id,
+            clinic_id=clinic_id,
             date=datetime.strptime(data["date"], "%Y-%m-%d").date(),
             start_time=datetime.strptime(data["start_time"], "%H:%M").time(),
             end_time=datetime.strptime(data["end_time"],   "%H:%M").time(),
@@ -60,10 +72,10 @@ def create_slot():
             status="open"
         )
         db.session.add(slot)
-        db.session.commit()
-
         # notify standby users
-        notify_standbys_for_slot(slot)
+        enqueue_slot_notification(slot)
+        publish_slot_changes(slot)
+        db.session.commit()
 
         return jsonify({"slot": slot.to_dict()}), 201
 
@@ -74,12 +86,12 @@ def create_slot():
 @clinic_bp.route("/slots/<int:slot_id>", methods=["PUT"])
 @jwt_required()
 def update_slot(slot_id):
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
     slot = Slot.query.get_or_404(slot_id)
-    if slot.clinic_id != clinic.id or slot.status != "open":
+    if slot.clinic_id != clinic_id or slot.status != "open":
         return jsonify({"error": "Access denied or not open"}), 403
 
     data = request.get_json() or {}
@@ -94,6 +106,7 @@ def update_slot(slot_id):
             slot.language = data["language"]
         if "specialization" in data:
             slot.specialization = data["specialization"]
+        publish_slot_changes(slot)
         db.session.commit()
         return jsonify({"slot": slot.to_dict()}), 200
 
@@ -104,15 +117,16 @@ def update_slot(slot_id):
 @clinic_bp.route("/slots/<int:slot_id>", methods=["DELETE"])
 @jwt_required()
 def cancel_slot(slot_id):
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
     slot = Slot.query.get_or_404(slot_id)
-    if slot.clinic_id != clinic.id:
+    if slot.clinic_id != clinic_id:
         return jsonify({"error": "Access denied"}), 403
 
     slot.status = "cancelled"
+    publish_slot_changes(slot)
     db.session.commit()
     return jsonify({"message": "Slot cancelled"}), 200
 
@@ -120,19 +134,19 @@ def cancel_slot(slot_id):
 @clinic_bp.route("/slots/<int:slot_id>/reopen", methods=["POST"])
 @jwt_required()
 def reopen_slot(slot_id):
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
     slot = Slot.query.get_or_404(slot_id)
-    if slot.clinic_id != clinic.id:
+    if slot.clinic_id != clinic_id:
         return jsonify({"error": "Access denied"}), 403
 
     slot.status = "open"
-    db.session.commit()
-
     # notify standby users again
-    notify_standbys_for_slot(slot)
+    enqueue_slot_notification(slot)
+    publish_slot_changes(slot)
+    db.session.commit()
 
     return jsonify({"message": "Slot reopened", "slot": slot.to_dict()}), 200
 
@@ -140,38 +154,37 @@ def reopen_slot(slot_id):
 @clinic_bp.route("/bookings", methods=["GET"])
 @jwt_required()
 def list_bookings():
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    slot_ids = [s.id for s in Slot.query.filter_by(clinic_id=clinic.id)]
     bookings = (
         Booking.query
-        .filter(Booking.slot_id.in_(slot_ids))
+        .join(Slot, Booking.slot_id == Slot.id)
+        .filter(Slot.clinic_id == clinic_id)
         .order_by(Booking.confirmed_at.desc())
-        .all()
     )
-    return jsonify([b.to_dict() for b in bookings]), 200
+    return stream_json_list(bookings, Booking.to_dict), 200
 
 
 @clinic_bp.route("/bookings/<int:booking_id>", methods=["DELETE"])
 @jwt_required()
 def cancel_booking(booking_id):
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
     booking = Booking.query.get_or_404(booking_id)
     slot = Slot.query.get(booking.slot_id)
-    if slot.clinic_id != clinic.id:
+    if slot.clinic_id != clinic_id:
         return jsonify({"error": "Access denied"}), 403
 
     db.session.delete(booking)
     slot.status = "open"
-    db.session.commit()
-
     # notify standby users for reopened slot
-    notify_standbys_for_slot(slot)
+    enqueue_slot_notification(slot)
+    publish_slot_changes(slot)
+    db.session.commit()
 
     return jsonify({"message": "Booking cancelled and slot reopened"}), 200
 
@@ -185,13 +198,14 @@ def list_cancellations():
     Return all currently-cancelled slots for this clinic.
     Frontend uses these as 'notifications'.
     """
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
     cancelled = (
         Slot.query
-        .filter_by(clinic_id=clinic.id, status="cancelled")
+        .filter_by(clinic_id=clinic_id, status="cancelled")
+        .options(joinedload(Slot.doctor))
         .order_by(Slot.date, Slot.start_time)
         .all()
     )
@@ -213,12 +227,12 @@ def clear_cancellation(slot_id):
     """
     Remove a cancelled-slot notification by deleting that slot.
     """
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
     slot = Slot.query.get_or_404(slot_id)
-    if slot.clinic_id != clinic.id or slot.status != "cancelled":
+    if slot.clinic_id != clinic_id or slot.status != "cancelled":
         return jsonify({"error": "Access denied or not cancelled"}), 403
 
     db.session.delete(slot)
@@ -229,8 +243,8 @@ def clear_cancellation(slot_id):
 @clinic_bp.route("/block-day", methods=["POST"])
 @jwt_required()
 def block_day():
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
     data = request.get_json() or {}
@@ -239,12 +253,15 @@ def block_day():
     except (KeyError, ValueError) as e:
         return jsonify({"error": "Invalid date", "details": str(e)}), 400
 
-    # remove any existing slots on that day
-    Slot.query.filter_by(clinic_id=clinic.id, date=block_date).delete()
+    # remove any existing slots on that day; open ones disappear from live streams
+    publish_slot_changes(*db.session.scalars(
+        select(Slot.id).filter_by(clinic_id=clinic_id, date=block_date, status="open")
+    ))
+    Slot.query.filter_by(clinic_id=clinic_id, date=block_date).delete()
 
     # create a full-day cancelled slot
     full = Slot(
-        clinic_id=clinic.id,
+        clinic_id=clinic_id,
         date=block_date,
         start_time=time(0, 0),
         end_time=time(23, 59),
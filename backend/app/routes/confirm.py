@@ -1,8 +1,9 @@
 from datetime import datetime
 from flask import Blueprint, request, render_template
 from app import db
+from app.models.booking import Booking
 from app.models.slot_confirmation import SlotConfirmation
-from app.models.slot import Slot
+from app.services.booking_service import book_slot_for_patient
 
 confirm_bp = Blueprint("confirm", __name__, url_prefix="/confirm")
 
@@ -10,13 +11,22 @@ confirm_bp = Blueprint("confirm", __name__, url_prefix="/confirm")
 def confirm_slot():
     token = request.args.get("token")
     c = SlotConfirmation.query.get(token)
-    if not c or c.used or c.expires_at < datetime.utcnow():
+    if not c:
         return render_template("confirm.html", status="invalid")
-    slot = Slot.query.get(c.slot_id)
-    if slot.status != "open":
-        return render_template("confirm.html", status="taken")
-    # mark it booked
-    slot.status = "booked"
+    if c.used:
+        # consumed by this patient's own booking, or invalidated when
+        # someone else booked the slot
+        booked = db.session.query(Booking.id).filter(
+            Booking.slot_id == c.slot_id,
+            Booking.patient_id == c.patient_id,
+            Booking.cancelled.is_not(True)
+        ).first()
+        return render_template("confirm.html", status="booked" if booked else "taken")
+    if c.expires_at < datetime.utcnow():
+        return render_template("confirm.html", status="invalid")
+    # book it; the token is only consumed if the booking succeeds
     c.used = True
-    db.session.commit()
+    success, _, _ = book_slot_for_patient(c.patient_id, c.slot_id)
+    if not success:
+        return render_template("confirm.html", status="taken")
     return render_template("confirm.html", status="success")
@@ -1,38 +1,40 @@
 # backend/app/routes/doctors.py
 
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+from flask_jwt_extended import jwt_required
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 from datetime import datetime, time
 
 from app import db
-from app.models.user import Clinic
 from app.models.doctor import Doctor
 from app.models.slot import Slot
 from app.models.booking import Booking
-# notification helper
-from app.services.notification_service import notify_standbys_for_slot
+# standby fan-out is queued in the outbox and sent by `flask notify-worker`
+from app.services.outbox_service import enqueue_slot_notification
+from app.services.schedule_service import generate_schedule, parse_weekdays
+from app.services.slot_stream_service import publish_slot_changes
+from app.utils.jwt import current_principal
+from app.utils.etag import query_fingerprint, weak_etag, not_modified, with_etag
 
 
 doctors_bp = Blueprint("doctors_bp", __name__)
 
 
-def get_current_clinic():
+def current_clinic_id():
     """
-    Return the Clinic instance for the logged‐in user, or None.
+    Return the logged‐in clinic's id from the token (no query), or None.
     """
-    claims = get_jwt()
-    if claims.get("role") != "clinic":
-        return None
-    clinic_id = get_jwt_identity()
-    return Clinic.query.get(int(clinic_id))
+    principal = current_principal()
+    return principal.id if principal.role == "clinic" else None
 
 
-def get_doctor(clinic, doctor_id):
+def get_doctor(clinic_id, doctor_id):
     """
     Fetch a Doctor by ID and ensure it belongs to this clinic.
     """
     doctor = Doctor.query.get_or_404(doctor_id)
-    if doctor.clinic_id != clinic.id:
+    if doctor.clinic_id != clinic_id:
         return None
     return doctor
 
@@ -42,13 +44,20 @@ def get_doctor(clinic, doctor_id):
 def list_doctors():
     """
     List all doctors for this clinic.
+    Supports If-None-Match against the weak ETag of the doctor list.
     """
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    doctors = Doctor.query.filter_by(clinic_id=clinic.id).all()
-    return jsonify([d.to_dict() for d in doctors]), 200
+    query = Doctor.query.filter_by(clinic_id=clinic_id)
+    etag = weak_etag(clinic_id, query_fingerprint(query, Doctor))
+    unchanged = not_modified(etag)
+    if unchanged:
+        return unchanged
+
+    doctors = query.all()
+    return with_etag(jsonify([d.to_dict() for d in doctors]), etag), 200
 
 
 @doctors_bp.route("", methods=["POST"])
@@ -58,8 +67,8 @@ def create_doctor():
     Create a new doctor under this clinic.
     JSON payload: { "name": "...", "specialization": "...", "languages": "English,German" }
     """
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
     data = request.get_json() or {}
@@ -68,7 +77,7 @@ def create_doctor():
         return jsonify({"error": "Doctor name is required."}), 400
 
     doctor = Doctor(
-        clinic_id=clinic.id,
+        clinic_id=clinic_id,
         name=name,
         specialization=data.get("specialization"),
         languages=data.get("languages")
@@ -84,11 +93,11 @@ def get_doctor_detail(doctor_id):
     """
     Fetch a single doctor’s details.
     """
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    doctor = get_doctor(clinic, doctor_id)
+    doctor = get_doctor(clinic_id, doctor_id)
     if not doctor:
         return jsonify({"error": "Not found"}), 404
 
@@ -102,11 +111,11 @@ def update_doctor(doctor_id):
     Update a doctor’s info.
     Accepts JSON with any of: name, specialization, languages
     """
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    doctor = get_doctor(clinic, doctor_id)
+    doctor = get_doctor(clinic_id, doctor_id)
     if not doctor:
         return jsonify({"error": "Not found"}), 404
 
@@ -128,14 +137,18 @@ def delete_doctor(doctor_id):
     """
     Remove a doctor (and all their slots/bookings via cascade).
     """
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    doctor = get_doctor(clinic, doctor_id)
+    doctor = get_doctor(clinic_id, doctor_id)
     if not doctor:
         return jsonify({"error": "Not found"}), 404
 
+    # their open slots disappear from live streams
+    publish_slot_changes(*db.session.scalars(
+        select(Slot.id).filter_by(doctor_id=doctor.id, status="open")
+    ))
     db.session.delete(doctor)
     db.session.commit()
     return jsonify({"message": "Doctor deleted."}), 200
@@ -147,17 +160,18 @@ def list_doctor_slots(doctor_id):
     """
     List all slots for a given doctor.
     """
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    doctor = get_doctor(clinic, doctor_id)
+    doctor = get_doctor(clinic_id, doctor_id)
     if not doctor:
         return jsonify({"error": "Not found"}), 404
 
     slots = (
         Slot.query
-        .filter_by(clinic_id=clinic.id, doctor_id=doctor.id)
+        .filter_by(clinic_id=clinic_id, doctor_id=doctor.id)
+        .options(joinedload(Slot.doctor))
         .order_by(Slot.date, Slot.start_time)
         .all()
     )
@@ -171,18 +185,18 @@ def create_doctor_slot(doctor_id):
     Create a new slot on this doctor’s calendar.
     JSON: { date, start_time, end_time, language? }
     """
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    doctor = get_doctor(clinic, doctor_id)
+    doctor = get_doctor(clinic_id, doctor_id)
     if not doctor:
         return jsonify({"error": "Not found"}), 404
 
     data = request.get_json() or {}
     try:
         slot = Slot(
-            clinic_id=clinic.id,
+            clinic_id=clinic_id,
             doctor_id=doctor.id,
             date=datetime.strptime(data["date"], "%Y-%m-%d").date(),
             start_time=datetime.strptime(data["start_time"], "%H:%M").time(),
@@ -192,10 +206,10 @@ def create_doctor_slot(doctor_id):
             status="open"
         )
         db.session.add(slot)
-        db.session.commit()
-
         # notify standby users for this new slot
-        notify_standbys_for_slot(slot)
+        enqueue_slot_notification(slot)
+        publish_slot_changes(slot)
+        db.session.commit()
 
         return jsonify({"slot": slot.to_dict()}), 201
 
@@ -203,22 +217,68 @@ def create_doctor_slot(doctor_id):
         return jsonify({"error": "Invalid input", "details": str(e)}), 400
 
 
+@doctors_bp.route("/<int:doctor_id>/schedule", methods=["POST"])
+@jwt_required()
+def create_doctor_schedule(doctor_id):
+    """
+    Generate recurring open slots for this doctor in one go.
+    JSON: {
+      weekdays: ["Monday", ...] or [0..6],
+      start_time, end_time, slot_minutes,
+      breaks?: [{from, to}], date_from, date_to, language?
+    }
+    Existing slots at the same date/start time are left untouched.
+    """
+    clinic_id = current_clinic_id()
+    if not clinic_id:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    doctor = get_doctor(clinic_id, doctor_id)
+    if not doctor:
+        return jsonify({"error": "Not found"}), 404
+
+    data = request.get_json() or {}
+    try:
+        slot_ids = generate_schedule(
+            doctor,
+            weekdays=parse_weekdays(data["weekdays"]),
+            start_time=datetime.strptime(data["start_time"], "%H:%M").time(),
+            end_time=datetime.strptime(data["end_time"], "%H:%M").time(),
+            slot_minutes=int(data["slot_minutes"]),
+            date_from=datetime.strptime(data["date_from"], "%Y-%m-%d").date(),
+            date_to=datetime.strptime(data["date_to"], "%Y-%m-%d").date(),
+            breaks=[
+                (datetime.strptime(b["from"], "%H:%M").time(),
+                 datetime.strptime(b["to"], "%H:%M").time())
+                for b in data.get("breaks") or []
+            ],
+            language=data.get("language", "English")
+        )
+        db.session.commit()
+        return jsonify({"message": f"{len(slot_ids)} slots created",
+                        "created": len(slot_ids)}), 201
+
+    except (KeyError, TypeError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({"error": "Invalid input", "details": str(e)}), 400
+
+
 @doctors_bp.route("/<int:doctor_id>/slots/<int:slot_id>", methods=["PUT"])
 @jwt_required()
 def update_doctor_slot(doctor_id, slot_id):
     """
     Update an existing slot on this doctor’s calendar.
     """
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    doctor = get_doctor(clinic, doctor_id)
+    doctor = get_doctor(clinic_id, doctor_id)
     if not doctor:
         return jsonify({"error": "Not found"}), 404
 
     slot = Slot.query.get_or_404(slot_id)
-    if slot.clinic_id != clinic.id or slot.doctor_id != doctor.id:
+    if slot.clinic_id != clinic_id or slot.doctor_id != doctor.id:
         return jsonify({"error": "Access denied"}), 403
     if slot.status != "open":
         return jsonify({"error": "Only open slots can be edited"}), 400
@@ -233,6 +293,7 @@ def update_doctor_slot(doctor_id, slot_id):
             slot.end_time = datetime.strptime(data["end_time"], "%H:%M").time()
         if "language" in data:
             slot.language = data["language"]
+        publish_slot_changes(slot)
         db.session.commit()
         return jsonify({"slot": slot.to_dict()}), 200
 
@@ -246,18 +307,19 @@ def cancel_doctor_slot(doctor_id, slot_id):
     """
     Cancel (soft‐delete) a slot on this doctor’s calendar.
     """
-    clinic = get_current_clinic()
-    if not clinic:
+    clinic_id = current_clinic_id()
+    if not clinic_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    doctor = get_doctor(clinic, doctor_id)
+    doctor = get_doctor(clinic_id, doctor_id)
     if not doctor:
         return jsonify({"error": "Not found"}), 404
 
     slot = Slot.query.get_or_404(slot_id)
-    if slot.clinic_id != clinic.id or slot.doctor_id != doctor.id:
+    if slot.clinic_id != clinic_id or slot.doctor_id != doctor.id:
         return jsonify({"error": "Access denied"}), 403
 
     slot.status = "cancelled"
+    publish_slot_changes(slot)
     db.session.commit()
     return jsonify({"message": "Slot cancelled"}), 200
@@ -1,27 +1,63 @@
 # backend/app/routes/patient.py
 
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, current_app, Response
+from flask_jwt_extended import jwt_required
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 from datetime import datetime
 import json
 
 from app import db
-from app.models.user import Patient, Clinic
+from app.models.user import Clinic
 from app.models.slot import Slot
 from app.models.booking import Booking
 from app.models.standby import StandbyPreference
 from app.models.dnd import DNDPreference
+from app.services.standby_service import index_standby_preference
+from app.services.notification_service import compile_dnd_preference
+from app.services.slot_service import (
+    search_open_slots, open_slots_query, doctors_version, get_slot_facets
+)
+from app.services.booking_service import book_slot_for_patient
+from app.services.slot_stream_service import (
+    broker, stream_slot_events, ensure_slot_event_listener, publish_slot_changes
+)
+from app.utils.jwt import current_principal
+from app.utils.etag import query_fingerprint, weak_etag, not_modified, with_etag
 
 patient_bp = Blueprint("patient_bp", __name__, url_prefix="/api/patient")
 
 
+def current_patient_id():
+    """
+    The logged-in patient's id, straight from the token (no query), or None.
+    """
+    principal = current_principal()
+    return principal.id if principal.role == "patient" else None
+
+
 def get_current_patient():
-    identity = get_jwt_identity()
-    patient = Patient.query.get(int(identity))
-    if not patient or patient.role != "patient":
-        return None
-    return patient
+    """
+    The logged-in Patient row (through the user cache), or None.
+    Only for routes that need more than the id.
+    """
+    principal = current_principal()
+    return principal.user if principal.role == "patient" else None
+
+
+def _patient_bookings(patient_id: int):
+    """
+    Query a patient's bookings with slot, doctor and clinic joined in,
+    so _serialize_booking issues no further queries.
+    """
+    return (
+        Booking.query
+        .filter_by(patient_id=patient_id)
+        .options(
+            joinedload(Booking.slot).joinedload(Slot.doctor),
+            joinedload(Booking.slot).joinedload(Slot.clinic)
+        )
+    )
 
 
 def _serialize_booking(booking: Booking):
@@ -29,9 +65,9 @@ def _serialize_booking(booking: Booking):
     Return a dict with booking info + doctor name, specialization,
     date, time, and default clinic city = 'Berlin' if not set.
     """
-    slot = Slot.query.get(booking.slot_id)
+    slot = booking.slot
     doctor = slot.doctor
-    clinic = Clinic.query.get(slot.clinic_id)
+    clinic = slot.clinic
     return {
         "id": booking.id,
         "doctor_name": doctor.name if doctor else "",
@@ -42,28 +78,144 @@ def _serialize_booking(booking: Booking):
     }
 
 
+def _slot_search_filters(args):
+    """
+    Slot search filters from query params, shared by the search and the
+    live stream. Raises ValueError on a malformed date or time.
+    """
+    def parse(name, fmt):
+        value = args.get(name)
+        return datetime.strptime(value, fmt) if value else None
+
+    date_from = parse("date_from", "%Y-%m-%d")
+    date_to   = parse("date_to",   "%Y-%m-%d")
+    time_from = parse("time_from", "%H:%M")
+    time_to   = parse("time_to",   "%H:%M")
+
+    return dict(
+        language=args.get("language") or args.get("lang"),
+        city=args.get("city"),
+        specialization=args.get("specialization") or args.get("specialty"),
+        doctor_id=args.get("doctor_id", type=int),
+        doctor_name=args.get("doctor"),
+        date_from=date_from.date() if date_from else None,
+        date_to=date_to.date() if date_to else None,
+        time_from=time_from.time() if time_from else None,
+        time_to=time_to.time() if time_to else None,
+    )
+
+
 @patient_bp.route("/slots", methods=["GET"])
 @jwt_required()
 def get_available_slots():
-    slots = Slot.query.filter_by(status="open").all()
-    return jsonify([slot.to_dict() for slot in slots]), 200
+    """
+    Search open slots, one page at a time.
+    Query params (all optional): language|lang, city, specialization|specialty,
+    doctor_id, doctor (name substring), date_from, date_to (YYYY-MM-DD),
+    time_from, time_to (HH:MM), cursor, limit.
+    The body is the list of slots; the cursor for the next page, if any,
+    is returned in the X-Next-Cursor header.
+    Responses carry a weak ETag; If-None-Match gets a 304 when the matching
+    slots have not changed.
+    """
+    args = request.args
+    max_limit = current_app.config["SLOT_SEARCH_MAX_PAGE_SIZE"]
+    try:
+        limit = int(args.get("limit", current_app.config["SLOT_SEARCH_PAGE_SIZE"]))
+        if limit < 1:
+            raise ValueError("limit must be positive")
+
+        filters = _slot_search_filters(args)
+        filters["cursor"] = args.get("cursor")
+        limit = min(limit, max_limit)
+
+        # fingerprint the matching set before loading any rows
+        etag = weak_etag(sorted(filters.items(), key=str), limit,
+                         query_fingerprint(open_slots_query(**filters), Slot,
+                                           doctors_version()))
+        unchanged = not_modified(etag)
+        if unchanged:
+            return unchanged
+
+        slots, next_cursor = search_open_slots(limit=limit, **filters)
+    except ValueError as e:
+        return jsonify({"error": "Invalid input", "details": str(e)}), 400
+
+    response = jsonify([slot.to_dict() for slot in slots])
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return with_etag(response, etag), 200
+
+
+@patient_bp.route("/slots/facets", methods=["GET"])
+@jwt_required()
+def slot_facets():
+    """
+    Open slot counts per language, specialization, city and day for the
+    same filters as GET /slots (cursor and limit do not apply).
+    Counts may be up to SLOT_FACETS_CACHE_SECONDS old.
+    """
+    patient_id = current_patient_id()
+    if not patient_id:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    try:
+        filters = _slot_search_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": "Invalid input", "details": str(e)}), 400
+
+    response = jsonify(get_slot_facets(**filters))
+    response.headers["Cache-Control"] = f"private, max-age={current_app.config['SLOT_FACETS_CACHE_SECONDS']}"
+    return response, 200
+
+
+@patient_bp.route("/slots/stream", methods=["GET"])
+@jwt_required(locations=["headers", "query_string"])
+def stream_slots():
+    """
+    Server-Sent Events with live changes to slots matching the same filters
+    as GET /slots (cursor and limit do not apply): slot.opened, slot.booked,
+    slot.cancelled and slot.removed, each with the slot as data.
+    A `reset` event means the client fell behind and should search again.
+    EventSource cannot send headers, so the token may be passed as ?jwt=.
+    """
+    patient_id = current_patient_id()
+    if not patient_id:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    try:
+        filters = _slot_search_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": "Invalid input", "details": str(e)}), 400
+
+    config = current_app.config
+    ensure_slot_event_listener(current_app._get_current_object())
+    subscriber = broker.subscribe(filters, config["SLOT_STREAM_QUEUE_SIZE"],
+                                  config["SLOT_STREAM_MAX_SUBSCRIBERS"])
+    if subscriber is None:
+        response = jsonify({"error": "Too many live subscriptions; try again later."})
+        response.headers["Retry-After"] = str(config["SLOT_STREAM_HEARTBEAT_SECONDS"])
+        return response, 503
+
+    response = Response(stream_slot_events(subscriber, config["SLOT_STREAM_HEARTBEAT_SECONDS"]),
+                        mimetype="text/event-stream")
+    # also when the client leaves before the first event
+    response.call_on_close(lambda: broker.unsubscribe(subscriber))
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
 
 @patient_bp.route("/book/<int:slot_id>", methods=["POST"])
 @jwt_required()
 def book_slot(slot_id):
-    patient = get_current_patient()
-    if not patient:
+    patient_id = current_patient_id()
+    if not patient_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    slot = Slot.query.get(slot_id)
-    if not slot or slot.status != "open":
-        return jsonify({"error": "Slot is no longer available."}), 400
-
-    slot.status = "booked"
-    booking = Booking(patient_id=patient.id, slot_id=slot.id)
-    db.session.add(booking)
-    db.session.commit()
+    success, message, booking = book_slot_for_patient(patient_id, slot_id)
+    if not success:
+        return jsonify({"error": message}), 400
 
     return jsonify({
         "message": "Slot booked successfully.",
@@ -74,11 +226,11 @@ def book_slot(slot_id):
 @patient_bp.route("/appointments", methods=["GET"])
 @jwt_required()
 def get_my_appointments():
-    patient = get_current_patient()
-    if not patient:
+    patient_id = current_patient_id()
+    if not patient_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    bookings = Booking.query.filter_by(patient_id=patient.id).all()
+    bookings = _patient_bookings(patient_id).all()
     return jsonify([_serialize_booking(b) for b in bookings]), 200
 
 
@@ -89,18 +241,19 @@ def cancel_appointment(booking_id):
     Patient cancels one of their bookings.
     Deletes the booking and marks the slot 'cancelled' so clinics see it.
     """
-    patient = get_current_patient()
-    if not patient:
+    patient_id = current_patient_id()
+    if not patient_id:
         return jsonify({"error": "Unauthorized"}), 403
 
     booking = Booking.query.get_or_404(booking_id)
-    if booking.patient_id != patient.id:
+    if booking.patient_id != patient_id:
         return jsonify({"error": "Access denied"}), 403
 
     slot = Slot.query.get(booking.slot_id)
     db.session.delete(booking)
     if slot:
         slot.status = "cancelled"
+        publish_slot_changes(slot)
     db.session.commit()
 
     return jsonify({"message": "Appointment cancelled."}), 200
@@ -121,6 +274,7 @@ def update_standby():
     standby.preferred_days           = data.get("preferred_days", "")
     standby.preferred_times          = data.get("preferred_times", "")
     standby.max_notifications_per_day = data.get("max_notifications_per_day", 5)
+    index_standby_preference(standby)
 
     db.session.add(standby)
     db.session.commit()
@@ -144,6 +298,7 @@ def update_dnd():
     dnd.temporarily_paused = data.get("temporarily_paused", False)
     dnd.dnd_days           = data.get("dnd_days", "")
     dnd.dnd_time_ranges    = json.dumps(data.get("dnd_time_ranges", []))
+    compile_dnd_preference(dnd)
 
     pause_until = data.get("pause_until")
     if pause_until:
@@ -175,36 +330,36 @@ def get_profile():
 @patient_bp.route("/history", methods=["GET"])
 @jwt_required()
 def get_history():
-    patient = get_current_patient()
-    if not patient:
+    patient_id = current_patient_id()
+    if not patient_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    past = Booking.query.filter_by(patient_id=patient.id).all()
+    past = _patient_bookings(patient_id).all()
     return jsonify([_serialize_booking(b) for b in past]), 200
 
 
 @patient_bp.route("/metrics", methods=["GET"])
 @jwt_required()
 def get_metrics():
-    patient = get_current_patient()
-    if not patient:
+    patient_id = current_patient_id()
+    if not patient_id:
         return jsonify({"error": "Unauthorized"}), 403
 
-    total = Booking.query.filter_by(patient_id=patient.id).count()
+    total = Booking.query.filter_by(patient_id=patient_id).count()
     return jsonify({"total_bookings": total}), 200
 
 
 @patient_bp.route("/top-clinics", methods=["GET"])
 @jwt_required()
 def top_clinics():
-    patient = get_current_patient()
-    if not patient:
+    patient_id = current_patient_id()
+    if not patient_id:
         return jsonify({"error": "Unauthorized"}), 403
 
     results = (
         db.session.query(Clinic, func.count(Booking.id).label("visits"))
         .join(Booking, Booking.clinic_id == Clinic.id)
-        .filter(Booking.patient_id == patient.id)
+        .filter(Booking.patient_id == patient_id)
         .group_by(Clinic.id)
         .order_by(func.count(Booking.id).desc())
         .limit(5)
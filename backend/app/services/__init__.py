@@ -2,5 +2,13 @@
 
 from .auth_service import *
 from .booking_service import *
+from .mail_service import *
 from .notification_service import *
 from .slot_service import *
+from .stats_service import *
+from .standby_service import *
+from .outbox_service import *
+from .schedule_service import *
+from .maintenance_service import *
+from .metrics_service import *
+from .slot_stream_service import *
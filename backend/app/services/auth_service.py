@@ -1,13 +1,43 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from werkzeug.security import generate_password_hash, check_password_hash
-from app.models.user import User
+from flask import current_app
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from app import db
+from app.models.user import User, Patient, Clinic, Admin
 from flask_jwt_extended import create_access_token
 from datetime import timedelta
 
+USER_MODELS = {"patient": Patient, "clinic": Clinic, "admin": Admin}
+
+# process-local cache: {user_id: (expires monotonic seconds, role, column values)}
+_user_cache = {}
+_user_cache_lock = threading.Lock()
+
+# bounded password hashing pool, created on first use
+_hash_pool = None
+_hash_slots = None
+_hash_pool_lock = threading.Lock()
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when the password hashing pool is saturated; callers answer 503.
+    """
+
+
 def hash_password(password: str) -> str:
     """
-    Generate a hashed password using Werkzeug.
+    Generate a hashed password using Werkzeug with the configured method.
     """
-    return generate_password_hash(password)
+    return generate_password_hash(
+        password,
+        method=current_app.config["PASSWORD_HASH_METHOD"],
+        salt_length=current_app.config["PASSWORD_SALT_LENGTH"]
+    )
 
 
 def verify_password(hashed: str, password: str) -> bool:
@@ -34,3 +64,130 @@ def is_authorized(identity, role: str) -> bool:
     Check if the current identity is authorized for a given role.
     """
     return identity and identity.get("role") == role
+
+
+def _user_cache_ttl() -> float:
+    ttl = current_app.config["USER_CACHE_SECONDS"]
+    return min(ttl, current_app.config["JWT_ACCESS_TOKEN_EXPIRES"].total_seconds())
+
+
+def get_cached_user(user_id: int, role: str):
+    """
+    Return the user row for (user_id, role) attached to the current session,
+    or None. Column values are cached per process for USER_CACHE_SECONDS
+    (capped at the access token lifetime); a hit rebuilds the instance
+    without touching the database, relationships still load lazily.
+    """
+    model = USER_MODELS.get(role)
+    if not model:
+        return None
+
+    ttl = _user_cache_ttl()
+    if ttl > 0:
+        with _user_cache_lock:
+            entry = _user_cache.get(user_id)
+        if entry and entry[0] > time.monotonic() and entry[1] == role:
+            user = model(**entry[2])
+            make_transient_to_detached(user)
+            return db.session.merge(user, load=False)
+
+    user = db.session.get(model, user_id)
+    if user is None or ttl <= 0:
+        return user
+
+    values = {attr.key: getattr(user, attr.key) for attr in inspect(model).column_attrs}
+    with _user_cache_lock:
+        if len(_user_cache) >= current_app.config["USER_CACHE_MAX_ENTRIES"]:
+            _user_cache.clear()
+        _user_cache[user_id] = (time.monotonic() + ttl, role, values)
+    return user
+
+
+def invalidate_cached_user(user_id: int):
+    """
+    Forget a cached user row, e.g. after the user was deleted or changed.
+    """
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
+
+def clear_user_cache():
+    with _user_cache_lock:
+        _user_cache.clear()
+
+
+def _get_hash_pool():
+    global _hash_pool, _hash_slots
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            workers = current_app.config["PASSWORD_HASH_WORKERS"]
+            _hash_pool = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix="password-hash")
+            _hash_slots = threading.BoundedSemaphore(
+                workers + current_app.config["PASSWORD_HASH_QUEUE_SIZE"])
+        return _hash_pool, _hash_slots
+
+
+def run_password_hashing(fn, *args):
+    """
+    Run a hashing call on the bounded pool and wait for its result.
+    At most PASSWORD_HASH_WORKERS hashes run at once and
+    PASSWORD_HASH_QUEUE_SIZE more may wait; beyond that the caller waits up
+    to PASSWORD_HASH_WAIT_SECONDS for room, then PasswordHasherBusy is raised.
+    hashlib releases the GIL, so the pool uses every core.
+    """
+    pool, slots = _get_hash_pool()
+    if not slots.acquire(timeout=current_app.config["PASSWORD_HASH_WAIT_SECONDS"]):
+        raise PasswordHasherBusy("Password hashing is saturated, try again shortly.")
+    try:
+        future = pool.submit(fn, *args)
+    except Exception:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future.result()
+
+
+@lru_cache(maxsize=8)
+def _hash_prefix(method: str, salt_length: int):
+    # the parameter prefix Werkzeug writes for a method, e.g. "pbkdf2:sha256:600000"
+    prefix, salt, _ = generate_password_hash("", method=method, salt_length=salt_length).split("$")
+    return prefix, len(salt)
+
+
+def password_needs_rehash(hashed: str) -> bool:
+    """
+    True if a stored hash was made with other parameters than the configured ones.
+    """
+    prefix, salt_length = _hash_prefix(current_app.config["PASSWORD_HASH_METHOD"],
+                                       current_app.config["PASSWORD_SALT_LENGTH"])
+    parts = hashed.split("$")
+    return len(parts) != 3 or parts[0] != prefix or len(parts[1]) != salt_length
+
+
+def set_user_password(user: User, password: str):
+    """
+    Hash a password on the bounded pool and store it on the user. The caller commits.
+    Raises PasswordHasherBusy when the pool is saturated.
+    """
+    user.password_hash = run_password_hashing(
+        generate_password_hash, password,
+        current_app.config["PASSWORD_HASH_METHOD"],
+        current_app.config["PASSWORD_SALT_LENGTH"]
+    )
+
+
+def check_user_password(user: User, password: str) -> bool:
+    """
+    Verify a login password on the bounded pool. On success, a hash stored
+    with outdated parameters is replaced by one with the configured
+    parameters (and committed).
+    Raises PasswordHasherBusy when the pool is saturated.
+    """
+    if not run_password_hashing(check_password_hash, user.password_hash, password):
+        return False
+    if password_needs_rehash(user.password_hash):
+        set_user_password(user, password)
+        db.session.commit()
+        invalidate_cached_user(user.id)
+    return True
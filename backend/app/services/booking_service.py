@@ -1,29 +1,75 @@
+from flask import current_app
 from app import db
 from app.models.booking import Booking
 from app.models.slot import Slot
+from app.models.slot_confirmation import SlotConfirmation
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
+from app.services.slot_stream_service import publish_slot_changes
+from app.services.outbox_service import enqueue_slot_taken_notification
 from datetime import datetime
 
 
-def book_slot_for_patient(patient_id: int, slot_id: int):
+def invalidate_sibling_confirmations(slot_id: int, patient_id: int):
     """
-    Attempts to book a slot for a patient.
-    Ensures slot is still available and updates both Slot and Booking records.
-    Returns: (success: bool, message: str, booking: Booking or None)
+    Mark every still-valid confirmation token for a slot as used with one
+    UPDATE (plus a SELECT where the database lacks RETURNING), so later
+    clicks on those links are answered from the token alone. Returns the
+    ids of the other patients who held a live link. The caller commits.
     """
-    slot = Slot.query.get(slot_id)
-
-    if not slot:
-        return False, "Slot does not exist.", None
+    live = (SlotConfirmation.slot_id == slot_id,
+            SlotConfirmation.used.is_not(True),
+            SlotConfirmation.expires_at >= datetime.utcnow())
+    invalidate = (update(SlotConfirmation)
+                  .where(*live)
+                  .values(used=True)
+                  .execution_options(synchronize_session=False))
+    if db.session.get_bind().dialect.update_returning:
+        holders = db.session.scalars(invalidate.returning(SlotConfirmation.patient_id))
+    else:
+        # No UPDATE ... RETURNING (SQLite before 3.35): read the holders first.
+        # The slot claim already holds the write lock, so the set cannot change
+        # between the two statements.
+        holders = db.session.scalars(select(SlotConfirmation.patient_id).where(*live)).all()
+        db.session.execute(invalidate)
+    return sorted({holder for holder in holders if holder != patient_id})
 
-    if slot.status != "open":
-        return False, "Slot is no longer available.", None
 
+def book_slot_for_patient(patient_id: int, slot_id: int):
+    """
+    Atomically book a slot for a patient. This is the single booking
+    primitive used by the patient booking route and standby confirmations.
+
+    The slot is claimed with a conditional
+    `UPDATE slots SET status='booked' WHERE id=:id AND status='open'`;
+    the database lets exactly one concurrent caller match that row, and
+    the Booking is inserted in the same transaction. Anything the caller
+    already changed in the session (e.g. marking a token used) is
+    committed or rolled back together with the booking, and so are the
+    invalidated sibling tokens and the optional "slot taken" notice.
+    Returns: (success: bool, message: str, booking: Booking or None)
+    """
     try:
-        # Lock the slot in transaction
-        slot.status = "booked"
-        booking = Booking(patient_id=patient_id, slot_id=slot.id)
+        claimed = db.session.execute(
+            update(Slot)
+            .where(Slot.id == slot_id, Slot.status == "open")
+            .values(status="booked")
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        if claimed != 1:
+            db.session.rollback()
+            if not db.session.get(Slot, slot_id):
+                return False, "Slot does not exist.", None
+            return False, "Slot is no longer available.", None
+
+        booking = Booking(patient_id=patient_id, slot_id=slot_id)
         db.session.add(booking)
+        publish_slot_changes(slot_id)
+
+        others = invalidate_sibling_confirmations(slot_id, patient_id)
+        if others and current_app.config["SLOT_TAKEN_NOTICES_ENABLED"]:
+            enqueue_slot_taken_notification(slot_id, others)
         db.session.commit()
         return True, "Slot booked successfully.", booking
 
@@ -48,6 +94,7 @@ def cancel_booking(booking_id: int, patient_id: int):
 
     booking.cancel()
     booking.slot.status = "open"
+    publish_slot_changes(booking.slot)
     db.session.commit()
 
     return True, "Booking cancelled and slot reopened."
@@ -64,11 +111,9 @@ def get_clinic_bookings(clinic_id: int):
     """
     Returns all bookings for slots belonging to a given clinic.
     """
-    from app.models.user import Clinic
-    clinic = Clinic.query.get(clinic_id)
-
-    if not clinic:
-        return []
-
-    slot_ids = [slot.id for slot in clinic.slots]
-    return Booking.query.filter(Booking.slot_id.in_(slot_ids)).all()
+    return (
+        Booking.query
+        .join(Slot, Booking.slot_id == Slot.id)
+        .filter(Slot.clinic_id == clinic_id)
+        .all()
+    )
@@ -0,0 +1,107 @@
+# backend/app/services/mail_service.py
+
+import logging
+import smtplib
+from flask import current_app
+from app import mail
+
+logger = logging.getLogger(__name__)
+
+
+def _close(conn):
+    """
+    Close the SMTP session of a connection, ignoring a server that already left.
+    """
+    if conn.host:
+        try:
+            conn.host.quit()
+        except Exception:
+            conn.host.close()
+    conn.host = None
+
+
+def _reconnect(conn):
+    """
+    Drop a (possibly broken) SMTP session and open a fresh one in its place.
+    """
+    _close(conn)
+    conn.num_emails = 0
+    if not conn.mail.suppress:
+        conn.host = conn.configure_host()
+
+
+def _is_open(conn) -> bool:
+    return conn.host is not None or conn.mail.suppress
+
+
+def _send_one(conn, msg) -> bool:
+    """
+    Send a message on an open connection, reconnecting and retrying once
+    if the server dropped us. Returns True on success.
+    """
+    for attempt in (1, 2):
+        try:
+            conn.send(msg)
+            return True
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as err:
+            # the server answered: the message is bad, the connection is fine
+            logger.error(f"SMTP rejected message to {msg.recipients}: {err}")
+            return False
+        except OSError as err:  # includes SMTPServerDisconnected and socket errors
+            logger.warning(f"SMTP connection failed (attempt {attempt}): {err}")
+            try:
+                _reconnect(conn)
+            except OSError as conn_err:
+                logger.error(f"SMTP reconnect failed: {conn_err}")
+                return False
+        except Exception as err:
+            logger.error(f"Could not send message to {msg.recipients}: {err}", exc_info=True)
+            return False
+    return False
+
+
+def deliver_messages(messages, batch_size: int = None):
+    """
+    Send Flask-Mail messages over one pooled SMTP connection, in batches of
+    NOTIFICATION_BATCH_SIZE. A dropped connection is reopened and the
+    message retried once.
+    Point MAIL_SERVER/MAIL_PORT at a local debugging server
+    (e.g. `python -m aiosmtpd -n -l localhost:1025`, MAIL_USE_TLS=false) to test.
+
+    Returns: {"sent": int, "failed": int, "failed_indexes": [int],
+              "batches": [{"batch", "sent", "failed"}]}
+    where failed_indexes are the positions in `messages` that were not sent.
+    """
+    batch_size = batch_size or current_app.config["NOTIFICATION_BATCH_SIZE"]
+    report = {"sent": 0, "failed": 0, "failed_indexes": [], "batches": []}
+    if not messages:
+        return report
+
+    conn = mail.connect()
+    conn.host = None
+    conn.num_emails = 0  # normally set by Connection.__enter__, which we bypass
+    try:
+        for start in range(0, len(messages), batch_size):
+            batch = messages[start:start + batch_size]
+            sent = failed = 0
+            for index, msg in enumerate(batch, start):
+                if not _is_open(conn):
+                    try:
+                        _reconnect(conn)
+                    except OSError as err:
+                        logger.error(f"Could not connect to SMTP server: {err}")
+                if _is_open(conn) and _send_one(conn, msg):
+                    sent += 1
+                else:
+                    failed += 1
+                    report["failed_indexes"].append(index)
+
+            number = start // batch_size + 1
+            report["batches"].append({"batch": number, "sent": sent, "failed": failed})
+            report["sent"] += sent
+            report["failed"] += failed
+            logger.info(f"Mail batch {number}: {sent} sent, {failed} failed")
+    finally:
+        _close(conn)
+
+    return report
@@ -0,0 +1,106 @@
+# backend/app/services/maintenance_service.py
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, delete
+from app import db
+from app.models.slot_confirmation import SlotConfirmation
+from app.models.notification_counter import NotificationCounter
+from app.services.slot_service import expire_old_slots
+
+logger = logging.getLogger(__name__)
+
+
+def purge_confirmation_tokens(now: datetime = None, batch_size: int = None,
+                              max_batches: int = None) -> int:
+    """
+    Delete confirmation tokens that expired more than TOKEN_RETENTION_HOURS
+    ago, used or not, in batches of
+    TOKEN_PURGE_BATCH_SIZE, committing after each batch so no single
+    transaction holds many row locks. Stops after TOKEN_PURGE_MAX_BATCHES;
+    the next run picks up the rest. Returns the number of tokens deleted.
+    Used tokens stay until then: confirm_slot reads them to tell the booker
+    the slot is theirs and everyone else that it was taken.
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(hours=current_app.config["TOKEN_RETENTION_HOURS"])
+    batch_size = batch_size or current_app.config["TOKEN_PURGE_BATCH_SIZE"]
+    max_batches = max_batches or current_app.config["TOKEN_PURGE_MAX_BATCHES"]
+
+    stale = (
+        select(SlotConfirmation.token)
+        .where(SlotConfirmation.expires_at < cutoff)
+        .limit(batch_size)
+    )
+    deleted = 0
+    for _ in range(max_batches):
+        result = db.session.execute(
+            delete(SlotConfirmation)
+            .where(SlotConfirmation.token.in_(stale.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            break
+    return deleted
+
+
+def purge_notification_counters(now: datetime = None) -> int:
+    """
+    Delete daily notification counters from before yesterday (one row per
+    notified patient per day; only today's are read). Returns the number deleted.
+    """
+    now = now or datetime.utcnow()
+    result = db.session.execute(
+        delete(NotificationCounter)
+        .where(NotificationCounter.day < now.date() - timedelta(days=1))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def run_maintenance(now: datetime = None):
+    """
+    One maintenance pass: expire past open slots, purge stale tokens and
+    old notification counters.
+    Returns {"expired_slots": int, "purged_tokens": int, "purged_counters": int}.
+    """
+    now = now or datetime.utcnow()
+    result = {
+        "expired_slots": expire_old_slots(now),
+        "purged_tokens": purge_confirmation_tokens(now),
+        "purged_counters": purge_notification_counters(now),
+    }
+    logger.info(f"Maintenance: expired {result['expired_slots']} slots, "
+                f"purged {result['purged_tokens']} confirmation tokens and "
+                f"{result['purged_counters']} notification counters")
+    return result
+
+
+def start_maintenance_scheduler(app):
+    """
+    Run run_maintenance() every MAINTENANCE_INTERVAL_SECONDS in a daemon
+    thread of this process. Every pass is idempotent, so several processes
+    running it at once only repeat work. Returns the thread.
+    """
+    interval = app.config["MAINTENANCE_INTERVAL_SECONDS"]
+
+    def loop():
+        while True:
+            with app.app_context():
+                try:
+                    run_maintenance()
+                except Exception as err:
+                    db.session.rollback()
+                    logger.error(f"Maintenance pass failed: {err}", exc_info=True)
+                finally:
+                    db.session.remove()
+            threading.Event().wait(interval)
+
+    thread = threading.Thread(target=loop, name="maintenance-scheduler", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,329 @@
+# backend/app/services/metrics_service.py
+
+import logging
+import os
+import sysconfig
+import threading
+import time
+import traceback
+import weakref
+from bisect import bisect_left
+from flask import g, request, has_app_context, current_app
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+slow_logger = logging.getLogger("quickdoc.slow_requests")
+nplusone_logger = logging.getLogger("quickdoc.nplusone")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+LIBRARY_DIRS = tuple({sysconfig.get_paths()[name] for name in ("stdlib", "purelib", "platlib")})
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus sense. Not thread-safe
+    on its own; the registry lock guards it.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Process-local request metrics keyed by Flask endpoint.
+    Each worker process keeps its own numbers.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.collectors = []     # callables returning extra exposition lines
+        self.reset()
+
+    def reset(self):
+        self.requests = {}       # (endpoint, method, status) -> count
+        self.latency = {}        # (endpoint, method) -> Histogram
+        self.sql_count = {}      # endpoint -> Histogram of statements per request
+        self.sql_seconds = {}    # endpoint -> total seconds spent in SQL
+        self.pool_wait = Histogram(POOL_WAIT_BUCKETS)
+        self.pool_timeouts = 0
+
+    def record(self, endpoint, method, status, seconds, sql_statements, sql_seconds):
+        with self.lock:
+            key = (endpoint, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.latency.setdefault((endpoint, method), Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.sql_count.setdefault(endpoint, Histogram(SQL_COUNT_BUCKETS)).observe(sql_statements)
+            self.sql_seconds[endpoint] = self.sql_seconds.get(endpoint, 0.0) + sql_seconds
+
+
+registry = MetricsRegistry()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+
+
+def _histogram_lines(name, labels, hist):
+    cumulative = 0
+    for bound, count in zip(list(hist.buckets) + ["+Inf"], hist.counts):
+        cumulative += count
+        yield f'{name}_bucket{{{_labels(**labels, le=bound)}}} {cumulative}'
+    label_set = f"{{{_labels(**labels)}}}" if labels else ""
+    yield f"{name}_sum{label_set} {hist.sum}"
+    yield f"{name}_count{label_set} {hist.count}"
+
+
+def render_metrics() -> str:
+    """
+    All metrics in the Prometheus text exposition format (version 0.0.4).
+    """
+    lines = []
+    with registry.lock:
+        lines.append("# HELP quickdoc_requests_total HTTP requests by endpoint, method and status.")
+        lines.append("# TYPE quickdoc_requests_total counter")
+        for (endpoint, method, status), count in sorted(registry.requests.items()):
+            lines.append(f"quickdoc_requests_total{{{_labels(endpoint=endpoint, method=method, status=status)}}} {count}")
+
+        lines.append("# HELP quickdoc_request_duration_seconds Request latency by endpoint and method.")
+        lines.append("# TYPE quickdoc_request_duration_seconds histogram")
+        for (endpoint, method), hist in sorted(registry.latency.items()):
+            lines.extend(_histogram_lines("quickdoc_request_duration_seconds",
+                                          {"endpoint": endpoint, "method": method}, hist))
+
+        lines.append("# HELP quickdoc_request_sql_statements SQL statements issued per request.")
+        lines.append("# TYPE quickdoc_request_sql_statements histogram")
+        for endpoint, hist in sorted(registry.sql_count.items()):
+            lines.extend(_histogram_lines("quickdoc_request_sql_statements",
+                                          {"endpoint": endpoint}, hist))
+
+        lines.append("# HELP quickdoc_request_sql_seconds_total Time spent executing SQL per endpoint.")
+        lines.append("# TYPE quickdoc_request_sql_seconds_total counter")
+        for endpoint, seconds in sorted(registry.sql_seconds.items()):
+            lines.append(f"quickdoc_request_sql_seconds_total{{{_labels(endpoint=endpoint)}}} {seconds}")
+
+        collectors = list(registry.collectors)
+
+    for collect in collectors:
+        lines.extend(collect())
+    return "\n".join(lines) + "\n"
+
+
+def register_collector(collect):
+    """
+    Add a callable returning extra exposition lines (e.g. pool gauges).
+    """
+    with registry.lock:
+        if collect not in registry.collectors:
+            registry.collectors.append(collect)
+
+
+# === Connection pool ===
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout takes: waiting for a free
+    connection, plus opening or pre-pinging one when that is needed.
+    """
+
+    pools = weakref.WeakSet()
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        TimedQueuePool.pools.add(self)
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            with registry.lock:
+                registry.pool_timeouts += 1
+            raise
+        finally:
+            with registry.lock:
+                registry.pool_wait.observe(time.perf_counter() - started)
+
+
+def _pool_metric_lines():
+    pools = list(TimedQueuePool.pools)
+    size = sum(pool.size() for pool in pools)
+    checked_out = sum(pool.checkedout() for pool in pools)
+    capacity = size + sum(max(pool._max_overflow, 0) for pool in pools)
+
+    yield "# HELP quickdoc_db_pool_size Configured connection pool size."
+    yield "# TYPE quickdoc_db_pool_size gauge"
+    yield f"quickdoc_db_pool_size {size}"
+    yield "# HELP quickdoc_db_pool_checked_out Connections currently checked out."
+    yield "# TYPE quickdoc_db_pool_checked_out gauge"
+    yield f"quickdoc_db_pool_checked_out {checked_out}"
+    yield "# HELP quickdoc_db_pool_saturation Checked-out connections over pool size plus overflow."
+    yield "# TYPE quickdoc_db_pool_saturation gauge"
+    yield f"quickdoc_db_pool_saturation {checked_out / capacity if capacity else 0.0}"
+    with registry.lock:
+        yield "# HELP quickdoc_db_pool_checkout_wait_seconds Time to check a connection out of the pool."
+        yield "# TYPE quickdoc_db_pool_checkout_wait_seconds histogram"
+        yield from _histogram_lines("quickdoc_db_pool_checkout_wait_seconds", {}, registry.pool_wait)
+        yield "# HELP quickdoc_db_pool_checkout_timeouts_total Checkouts that gave up after DB_POOL_TIMEOUT."
+        yield "# TYPE quickdoc_db_pool_checkout_timeouts_total counter"
+        yield f"quickdoc_db_pool_checkout_timeouts_total {registry.pool_timeouts}"
+
+
+def instrument_engine_options(options: dict) -> dict:
+    """
+    Engine options using TimedQueuePool, and its metrics registered.
+    Only for databases that pool with a QueuePool (Postgres).
+    """
+    register_collector(_pool_metric_lines)
+    return {**options, "poolclass": TimedQueuePool}
+
+
+# === SQL capture ===
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # kept on the execution context, which dies with the statement, so one
+    # that raises leaves nothing behind on the (pooled) connection
+    if context is not None:
+        context._quickdoc_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not has_app_context():
+        return
+    sql = g.get("request_sql")
+    if sql is None:
+        return
+    started = getattr(context, "_quickdoc_started", None)
+    elapsed = time.perf_counter() - started if started is not None else 0.0
+    sql["count"] += 1
+    sql["seconds"] += elapsed
+    if sql["capture"] and len(sql["statements"]) < sql["capture"]:
+        sql["statements"].append((elapsed, statement))
+    if sql["selects"] is not None and statement.lstrip()[:6].upper() == "SELECT":
+        _count_select(sql["selects"], statement)
+
+
+def _listen_sql_events():
+    # engine events are global; register them once per process
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# === N+1 detection ===
+
+class NPlusOneError(RuntimeError):
+    """
+    Raised when NPLUSONE_DETECTION is "raise" and a request repeats a SELECT.
+    """
+
+
+def _call_site(limit=3):
+    # innermost frames of our own code: not this module, not installed libraries
+    frames = [frame for frame in traceback.extract_stack()
+              if frame.filename != __file__ and not frame.filename.startswith(LIBRARY_DIRS)]
+
+    def where(frame):
+        path = frame.filename
+        if path.startswith(BACKEND_DIR):
+            path = os.path.relpath(path, BACKEND_DIR)
+        return f"{path}:{frame.lineno} in {frame.name}"
+
+    return " <- ".join(where(frame) for frame in reversed(frames[-limit:])) or "unknown"
+
+
+def _count_select(selects, statement):
+    """
+    Count a parameterized SELECT; the same text with different parameters
+    is the same statement. Reported once per request, when it reaches
+    NPLUSONE_THRESHOLD.
+    """
+    selects[statement] = selects.get(statement, 0) + 1
+    if selects[statement] != current_app.config["NPLUSONE_THRESHOLD"]:
+        return
+
+    message = (
+        f"Possible N+1: the same SELECT ran {selects[statement]} times in "
+        f"{request.method} {request.path} ({request.endpoint or 'unmatched'})\n"
+        f"  at {_call_site()}\n  {' '.join(statement.split())}"
+    )
+    if current_app.config["NPLUSONE_DETECTION"] == "raise":
+        raise NPlusOneError(message)
+    nplusone_logger.warning(message)
+
+
+# === Request hooks ===
+
+def _start_request():
+    threshold = current_app.config["SLOW_REQUEST_MS"]
+    g.request_started = time.perf_counter()
+    g.request_sql = {
+        "count": 0,
+        "seconds": 0.0,
+        "statements": [],
+        "capture": current_app.config["SLOW_REQUEST_MAX_STATEMENTS"] if threshold > 0 else 0,
+        "selects": {} if current_app.config["NPLUSONE_DETECTION"] in ("log", "raise") else None,
+    }
+
+
+def _finish_request(status):
+    started = g.pop("request_started", None)
+    sql = g.pop("request_sql", None)
+    if started is None or sql is None:
+        return
+    seconds = time.perf_counter() - started
+    endpoint = request.endpoint or "unmatched"
+    registry.record(endpoint, request.method, status, seconds, sql["count"], sql["seconds"])
+
+    threshold = current_app.config["SLOW_REQUEST_MS"]
+    if threshold > 0 and seconds * 1000 >= threshold:
+        statements = "\n".join(f"  [{elapsed * 1000:.1f} ms] {statement}"
+                               for elapsed, statement in sql["statements"])
+        slow_logger.warning(
+            f"Slow request {request.method} {request.path} -> {status} "
+            f"({endpoint}) took {seconds * 1000:.1f} ms, "
+            f"{sql['count']} SQL statements in {sql['seconds'] * 1000:.1f} ms\n{statements}"
+        )
+
+
+def init_request_metrics(app):
+    """
+    Record latency, status and SQL count/time for every request, keyed by
+    endpoint, and log requests slower than SLOW_REQUEST_MS with their SQL.
+    Streaming responses are measured until the response object is returned.
+    With NPLUSONE_DETECTION set, repeated SELECTs within a request are
+    logged or raised as NPlusOneError.
+    """
+    _listen_sql_events()
+
+    @app.before_request
+    def metrics_before_request():
+        _start_request()
+
+    @app.after_request
+    def metrics_after_request(response):
+        _finish_request(response.status_code)
+        return response
+
+    @app.teardown_request
+    def metrics_teardown_request(exc):
+        # after_request does not run when a view raised
+        if exc is not None:
+            _finish_request(500)
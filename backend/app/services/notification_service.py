@@ -2,57 +2,87 @@
 
 import logging
 import json
+import uuid
 from datetime import datetime, timedelta
 from flask import current_app
 from flask_mail import Message
-from app import db, mail
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
 from app.models.slot import Slot
+from app.models.user import Patient
 from app.models.standby import StandbyPreference
 from app.models.dnd import DNDPreference
 from app.models.slot_confirmation import SlotConfirmation
+from app.models.notification_counter import NotificationCounter
+from app.services.standby_service import (
+    find_standby_candidates, find_standby_candidates_for_slots
+)
+from app.services.mail_service import deliver_messages
+from app.utils.time_utils import (
+    minute_of_day, weekday_mask, pack_minute_ranges,
+    unpack_minute_ranges, overlaps_minute_ranges
+)
 
 logger = logging.getLogger(__name__)
 
 # === DND + Time Helpers ===
 
-def is_within_dnd(dnd: DNDPreference, slot: Slot) -> bool:
+def parse_dnd_ranges(raw: str):
+    """
+    Parse a dnd_time_ranges JSON value into (start_minute, end_minute) pairs.
+    Parsing stops at the first malformed entry.
+    """
+    ranges = []
+    if not raw:
+        return ranges
+    try:
+        for r in json.loads(raw):
+            start = datetime.strptime(r.get('from') or r.get('start_time'), '%H:%M').time()
+            end   = datetime.strptime(r.get('to')   or r.get('end_time'),   '%H:%M').time()
+            ranges.append((minute_of_day(start), minute_of_day(end)))
+    except Exception as err:
+        logger.error(f"Error parsing DND time ranges: {err}", exc_info=True)
+    return ranges
+
+
+def compile_dnd_preference(dnd: DNDPreference):
+    """
+    Store the compiled day mask and minute ranges of a DND preference.
+    Called whenever dnd_days / dnd_time_ranges are saved. The caller commits.
+    """
+    dnd.dnd_day_mask = weekday_mask(dnd.dnd_days.split(',') if dnd.dnd_days else [])
+    dnd.dnd_minutes  = pack_minute_ranges(parse_dnd_ranges(dnd.dnd_time_ranges))
+
+
+def is_within_dnd(dnd: DNDPreference, slot: Slot, now: datetime = None) -> bool:
     """
     Check if the slot falls within a patient's DND settings.
+    Uses the compiled columns; rows saved before compilation existed are
+    compiled on the fly.
     """
-    if not dnd or not dnd.enabled:
+    if not dnd:
         return False
 
     # Temporarily paused overrides everything
-    if getattr(dnd, "temporarily_paused", False) and \
-       getattr(dnd, "pause_until", None) and \
-       dnd.pause_until > datetime.utcnow():
+    if dnd.temporarily_paused and dnd.pause_until and \
+       dnd.pause_until > (now or datetime.utcnow()):
         return True
 
-    # Check day names
-    day_name = slot.date.strftime('%A')
-    if getattr(dnd, "dnd_days", None) and day_name in dnd.dnd_days.split(','):
+    # Check days
+    day_mask = dnd.dnd_day_mask
+    if day_mask is None:
+        day_mask = weekday_mask(dnd.dnd_days.split(',') if dnd.dnd_days else [])
+    if day_mask & (1 << slot.date.weekday()):
         return True
 
-    # Check date span
-    if getattr(dnd, "start_date", None) and slot.date < dnd.start_date:
-        return False
-    if getattr(dnd, "end_date", None) and slot.date > dnd.end_date:
-        return False
-
     # Check time ranges
-    ranges_json = getattr(dnd, "dnd_time_ranges", None)
-    if ranges_json:
-        try:
-            ranges = json.loads(ranges_json)
-            for r in ranges:
-                start = datetime.strptime(r.get('from') or r.get('start_time'), '%H:%M').time()
-                end   = datetime.strptime(r.get('to')   or r.get('end_time'),   '%H:%M').time()
-                if slot.start_time < end and slot.end_time > start:
-                    return True
-        except Exception as err:
-            logger.error(f"Error parsing DND time ranges: {err}", exc_info=True)
-
-    return False
+    if dnd.dnd_minutes is not None:
+        ranges = unpack_minute_ranges(dnd.dnd_minutes)
+    else:
+        ranges = parse_dnd_ranges(dnd.dnd_time_ranges)
+    return overlaps_minute_ranges(ranges, minute_of_day(slot.start_time),
+                                  minute_of_day(slot.end_time))
 
 
 # === Standby Notification Flow ===
@@ -99,72 +129,389 @@ def parse_time_windows(raw: str):
     return windows
 
 
+def compile_standby_preference(pref: StandbyPreference):
+    """
+    Store preferred_times as packed minute-of-day ranges. The caller commits.
+    """
+    pref.preferred_minutes = pack_minute_ranges(
+        (minute_of_day(w["start_time"]), minute_of_day(w["end_time"]))
+        for w in parse_time_windows(pref.preferred_times or "")
+    )
+
+
+def standby_minute_ranges(pref: StandbyPreference):
+    """
+    Return the (start, end) minute ranges of a preference, compiling on the
+    fly for rows saved before compilation existed.
+    """
+    if pref.preferred_minutes is not None:
+        return unpack_minute_ranges(pref.preferred_minutes)
+    return [(minute_of_day(w["start_time"]), minute_of_day(w["end_time"]))
+            for w in parse_time_windows(pref.preferred_times or "")]
+
+
+def confirmation_link(token: str) -> str:
+    return f"{current_app.config['FRONTEND_URL']}/confirm?token={token}"
+
+
+def store_confirmation_tokens(pairs):
+    """
+    Create one SlotConfirmation per (slot_id, patient_id) pair in a single
+    bulk insert and commit. Returns {(slot_id, patient_id): token}.
+    Nothing may be mailed unless this succeeds; on failure the error
+    propagates so the outbox worker retries the whole fan-out.
+    """
+    expires_at = datetime.utcnow() + timedelta(hours=2)
+    tokens = {pair: str(uuid.uuid4()) for pair in pairs}
+    if not tokens:
+        return tokens
+    try:
+        db.session.execute(insert(SlotConfirmation), [
+            {"token": token, "slot_id": slot_id, "patient_id": patient_id,
+             "expires_at": expires_at, "used": False}
+            for (slot_id, patient_id), token in tokens.items()
+        ])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.error("Could not create confirmation tokens; no emails sent", exc_info=True)
+        raise
+    logger.info(f"Created {len(tokens)} confirmation tokens")
+    return tokens
+
+
+def _counter_increment():
+    """
+    INSERT ... ON CONFLICT DO UPDATE adding `count` to a patient's counter
+    for the day; executed once with many rows.
+    """
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}[
+        db.session.get_bind().dialect.name]
+    stmt = dialect_insert(NotificationCounter)
+    return stmt.on_conflict_do_update(
+        index_elements=[NotificationCounter.patient_id, NotificationCounter.day],
+        set_={"count": NotificationCounter.count + stmt.excluded.count},
+    )
+
+
+def apply_daily_caps(prefs, now: datetime = None):
+    """
+    Drop preferences whose patient was already sent max_notifications_per_day
+    standby emails today (UTC) and count one more email for each of the rest.
+    One SELECT and one upsert, whatever the number of recipients; the
+    increments commit together with the confirmation tokens, and
+    record_undelivered() gives back those whose email then fails.
+    A NULL cap means no limit. Returns (allowed prefs, number suppressed).
+    """
+    if not prefs:
+        return [], 0
+    day = (now or datetime.utcnow()).date()
+
+    sent = dict(db.session.execute(
+        select(NotificationCounter.patient_id, NotificationCounter.count)
+        .where(NotificationCounter.day == day,
+               NotificationCounter.patient_id.in_({pref.patient_id for pref in prefs}))
+    ).all())
+    allowed = [
+        pref for pref in prefs
+        if pref.max_notifications_per_day is None
+        or sent.get(pref.patient_id, 0) < pref.max_notifications_per_day
+    ]
+    count_daily_notifications([pref.patient_id for pref in allowed], day)
+    return allowed, len(prefs) - len(allowed)
+
+
+def count_daily_notifications(patient_ids, day):
+    """
+    Count one more standby email for each patient on `day`, in one upsert.
+    The caller commits.
+    """
+    if patient_ids:
+        db.session.execute(_counter_increment(), [
+            {"patient_id": patient_id, "day": day, "count": 1} for patient_id in patient_ids
+        ])
+
+
+def record_undelivered(report, recipients, day):
+    """
+    After deliver_messages(): give back the daily-cap count of every patient
+    whose email was not sent, and list them with their confirmation tokens
+    under report["undelivered"] ({patient_id: [token, ...]}) so the outbox
+    can re-send just those. `recipients` holds one (patient_id, tokens)
+    pair per message, in message order. Commits the refund.
+    """
+    undelivered = dict(recipients[i] for i in report["failed_indexes"])
+    if undelivered:
+        db.session.execute(
+            update(NotificationCounter)
+            .where(NotificationCounter.day == day,
+                   NotificationCounter.patient_id.in_(undelivered))
+            .values(count=NotificationCounter.count - 1)
+        )
+        db.session.commit()
+    report["undelivered"] = undelivered
+    return report
+
+
+def _offer_message(user, slot: Slot, link: str) -> Message:
+    body = f"""
+Hi {user.name},
+
+A {slot.specialization or 'slot'} opened on {slot.date}
+from {slot.start_time.strftime('%H:%M')} to {slot.end_time.strftime('%H:%M')}.
+Click here to confirm (expires in 2 hours):
+
+{link}
+
+If someone else books it first, you’ll be notified it’s gone.
+"""
+    return Message(
+        subject="QuickDoc: Slot Available for You",
+        recipients=[user.email],
+        body=body,
+    )
+
+
+def _digest_message(user, offers) -> Message:
+    """
+    One email listing several (slot, link) offers.
+    """
+    lines = "\n".join(
+        f"- {slot.date} {slot.start_time.strftime('%H:%M')}–{slot.end_time.strftime('%H:%M')}"
+        f"{' (' + slot.specialization + ')' if slot.specialization else ''}: {link}"
+        for slot, link in offers
+    )
+    body = f"""
+Hi {user.name},
+
+New appointment slots opened that match your standby preferences.
+Click a link to confirm (each expires in 2 hours):
+
+{lines}
+
+If someone else books a slot first, you’ll be notified it’s gone.
+"""
+    return Message(
+        subject="QuickDoc: New Slots Available for You",
+        recipients=[user.email],
+        body=body,
+    )
+
+
 def notify_standbys_for_slot(slot: Slot):
     """
     When a slot opens or reopens, email all standby users whose prefs overlap—
-    skipping anyone in DND—and generate a one-time confirmation link.
+    skipping anyone in DND or at their daily cap—and generate a one-time
+    confirmation link.
+    Emails go out over one pooled SMTP connection once every recipient is known.
+    Returns the delivery report from deliver_messages(), plus the number of
+    recipients `suppressed` by the daily cap and the `undelivered` ones
+    (see record_undelivered).
     """
     if slot.status != 'open':
         logger.debug(f"Slot {slot.id} skipped: status is '{slot.status}'")
-        return
+        return {**deliver_messages([]), "suppressed": 0, "undelivered": {}}
+
+    # only preferences indexed under the slot's language and hours can match;
+    # the index enforces the language filter, patients and DND rows are preloaded
+    prefs = find_standby_candidates(slot)
+    logger.info(f"Found {len(prefs)} candidate standby preferences")
 
-    prefs = StandbyPreference.query.filter_by(enabled=True).all()
-    logger.info(f"Found {len(prefs)} enabled standby preferences")
+    slot_start = minute_of_day(slot.start_time)
+    slot_end   = minute_of_day(slot.end_time)
+    now = datetime.utcnow()
 
+    recipients = []
     for pref in prefs:
         try:
-            # --- Language filter ---
-            langs = pref.preferred_languages.split(',') if pref.preferred_languages else []
-            if langs and slot.language not in langs:
-                logger.debug(f"Pref {pref.id} skipped: language mismatch")
-                continue
-
-            # --- Time window parsing & overlap check ---
-            windows = parse_time_windows(pref.preferred_times or "")
-            if not any(
-                slot.start_time < w["end_time"] and slot.end_time > w["start_time"]
-                for w in windows
-            ):
+            # --- Time window overlap check ---
+            if not overlaps_minute_ranges(standby_minute_ranges(pref), slot_start, slot_end):
                 logger.debug(f"Pref {pref.id} skipped: no time overlap")
                 continue
 
             # --- DND skip ---
-            dnd_pref = DNDPreference.query.filter_by(patient_id=pref.patient_id).first()
-            if is_within_dnd(dnd_pref, slot):
+            if is_within_dnd(pref.patient.dnd, slot, now):
                 logger.debug(f"Pref {pref.id} skipped: in DND window")
                 continue
 
-            # --- Create confirmation token ---
-            confirm = SlotConfirmation(
-                slot_id=slot.id,
-                patient_id=pref.patient_id,
-                expires_at=datetime.utcnow() + timedelta(hours=2)
-            )
-            db.session.add(confirm)
-            db.session.commit()
-            logger.info(f"Created confirmation token {confirm.token} for pref {pref.id}")
-
-            # --- Send email ---
-            link = f"{current_app.config['FRONTEND_URL']}/confirm?token={confirm.token}"
-            user = pref.patient
-            body = f"""
-Hi {user.name},
+            recipients.append(pref)
 
-A {slot.specialization or 'slot'} opened on {slot.date}
-from {slot.start_time.strftime('%H:%M')} to {slot.end_time.strftime('%H:%M')}.
-Click here to confirm (expires in 2 hours):
+        except Exception as err:
+            logger.error(f"Failed notifying pref {pref.id}: {err}", exc_info=True)
 
-{link}
+    # --- Daily cap: one bulk check + increment ---
+    recipients, suppressed = apply_daily_caps(recipients, now)
 
-If someone else books it first, you’ll be notified it’s gone.
-"""
-            msg = Message(
-                subject="QuickDoc: Slot Available for You",
-                recipients=[user.email],
-                body=body,
-            )
-            mail.send(msg)
-            logger.info(f"Sent confirmation email to patient {pref.patient_id}")
+    # --- Create all confirmation tokens in one insert + commit ---
+    tokens = store_confirmation_tokens([(slot.id, pref.patient_id) for pref in recipients])
+
+    # --- Build emails ---
+    messages, sent_to = [], []
+    for pref in recipients:
+        token = tokens[(slot.id, pref.patient_id)]
+        messages.append(_offer_message(pref.patient, slot, confirmation_link(token)))
+        sent_to.append((pref.patient_id, [token]))
+
+    # --- Send emails ---
+    report = deliver_messages(messages)
+    record_undelivered(report, sent_to, now.date())
+    report["suppressed"] = suppressed
+    logger.info(f"Slot {slot.id}: notified {report['sent']} standby patients, "
+                f"{report['failed']} failed, {suppressed} over their daily cap")
+    return report
+
+
+def notify_standbys_for_slots(slots):
+    """
+    Batched fan-out for many slots opened at once (e.g. a generated schedule).
+    Runs one candidate query for the whole set and sends each matching
+    patient a single digest with links for their soonest
+    SCHEDULE_DIGEST_MAX_SLOTS matching slots, instead of one email per slot.
+    A digest counts as one email towards the daily cap.
+    Returns the delivery report from deliver_messages(), plus the number of
+    recipients `suppressed` by the daily cap and the `undelivered` ones
+    (see record_undelivered).
+    """
+    slots = [s for s in slots if s.status == 'open']
+    if not slots:
+        return {**deliver_messages([]), "suppressed": 0, "undelivered": {}}
 
+    prefs = find_standby_candidates_for_slots(slots)
+    logger.info(f"Found {len(prefs)} candidate standby preferences for {len(slots)} slots")
+
+    # slots sharing language, times and weekday match exactly the same patients
+    groups = {}
+    for slot in sorted(slots, key=lambda s: (s.date, s.start_time, s.id)):
+        key = (slot.language, minute_of_day(slot.start_time),
+               minute_of_day(slot.end_time), slot.date.weekday())
+        groups.setdefault(key, []).append(slot)
+
+    max_links = current_app.config["SCHEDULE_DIGEST_MAX_SLOTS"]
+    now = datetime.utcnow()
+
+    matches = {}
+    for pref in prefs:
+        try:
+            langs = pref.preferred_languages.split(',') if pref.preferred_languages else []
+            ranges = standby_minute_ranges(pref)
+            matched = []
+            for (language, start, end, _), group in groups.items():
+                if langs and language not in langs:
+                    continue
+                if not overlaps_minute_ranges(ranges, start, end):
+                    continue
+                if is_within_dnd(pref.patient.dnd, group[0], now):
+                    continue
+                matched.extend(group)
+            if matched:
+                matched.sort(key=lambda s: (s.date, s.start_time, s.id))
+                matches[pref] = matched[:max_links]
         except Exception as err:
-            logger.error(f"Failed notifying pref {pref.id}: {err}", exc_info=True)
+            logger.error(f"Failed matching pref {pref.id}: {err}", exc_info=True)
+
+    allowed, suppressed = apply_daily_caps(list(matches), now)
+    matches = {pref: matches[pref] for pref in allowed}
+
+    tokens = store_confirmation_tokens([
+        (slot.id, pref.patient_id) for pref, matched in matches.items() for slot in matched
+    ])
+
+    messages, sent_to = [], []
+    for pref, matched in matches.items():
+        slot_tokens = [tokens[(slot.id, pref.patient_id)] for slot in matched]
+        messages.append(_digest_message(pref.patient, [
+            (slot, confirmation_link(token)) for slot, token in zip(matched, slot_tokens)
+        ]))
+        sent_to.append((pref.patient_id, slot_tokens))
+
+    report = deliver_messages(messages)
+    record_undelivered(report, sent_to, now.date())
+    report["suppressed"] = suppressed
+    logger.info(f"{len(slots)} slots: notified {report['sent']} standby patients, "
+                f"{report['failed']} failed, {suppressed} over their daily cap")
+    return report
+
+
+def resend_standby_offers(tokens_by_patient, now: datetime = None):
+    """
+    Re-send standby offers whose email failed, reusing their confirmation
+    tokens ({patient_id: [token, ...]}, as in report["undelivered"]).
+    Links that were used, expired or whose slot is no longer open are
+    dropped; a patient left with one link gets the single-slot email,
+    with several a digest. Each email counts towards the daily cap again,
+    and is given back if it fails once more.
+    """
+    now = now or datetime.utcnow()
+    tokens = [token for patient_tokens in tokens_by_patient.values() for token in patient_tokens]
+    if not tokens:
+        return {**deliver_messages([]), "undelivered": {}}
+
+    rows = db.session.execute(
+        select(SlotConfirmation.patient_id, SlotConfirmation.token, Slot)
+        .join(Slot, SlotConfirmation.slot_id == Slot.id)
+        .where(SlotConfirmation.token.in_(tokens),
+               SlotConfirmation.used.is_(False),
+               SlotConfirmation.expires_at > now,
+               Slot.status == 'open')
+        .order_by(Slot.date, Slot.start_time, Slot.id)
+    ).all()
+
+    offers = {}
+    for patient_id, token, slot in rows:
+        offers.setdefault(patient_id, []).append((slot, token))
+    patients = {p.id: p for p in Patient.query.filter(Patient.id.in_(offers)).all()} if offers else {}
+
+    count_daily_notifications(list(patients), now.date())
+    db.session.commit()
+
+    messages, sent_to = [], []
+    for patient_id, patient in patients.items():
+        patient_offers = offers[patient_id]
+        if len(patient_offers) == 1:
+            slot, token = patient_offers[0]
+            messages.append(_offer_message(patient, slot, confirmation_link(token)))
+        else:
+            messages.append(_digest_message(patient, [
+                (slot, confirmation_link(token)) for slot, token in patient_offers
+            ]))
+        sent_to.append((patient_id, [token for _, token in patient_offers]))
+
+    report = deliver_messages(messages)
+    record_undelivered(report, sent_to, now.date())
+    logger.info(f"Re-sent standby offers to {report['sent']} patients, "
+                f"{report['failed']} failed, {len(tokens_by_patient) - len(patients)} no longer valid")
+    return report
+
+
+def notify_slot_taken(slot: Slot, patient_ids):
+    """
+    Tell standby patients whose confirmation link for `slot` was invalidated
+    by someone else's booking that it is gone, as the offer email promised.
+    One query for the patients; mails go out in pooled batches.
+    Returns the delivery report from deliver_messages(), with the ids of
+    the patients whose email failed under `undelivered`.
+    """
+    patients = Patient.query.filter(Patient.id.in_(patient_ids)).all() if patient_ids else []
+
+    messages = []
+    for patient in patients:
+        body = f"""
+Hi {patient.name},
+
+The {slot.specialization or 'appointment'} slot on {slot.date}
+from {slot.start_time.strftime('%H:%M')} to {slot.end_time.strftime('%H:%M')}
+has been booked by someone else, so its confirmation link no longer works.
+
+You are still on standby; we will email you when another matching slot opens.
+"""
+        messages.append(Message(
+            subject="QuickDoc: Slot No Longer Available",
+            recipients=[patient.email],
+            body=body,
+        ))
+
+    report = deliver_messages(messages)
+    report["undelivered"] = [patients[i].id for i in report["failed_indexes"]]
+    logger.info(f"Slot {slot.id}: told {report['sent']} standby patients it is taken, "
+                f"{report['failed']} failed")
+    return report
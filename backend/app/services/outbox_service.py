@@ -0,0 +1,175 @@
+# backend/app/services/outbox_service.py
+
+import json
+import logging
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import or_, and_
+from app import db
+from app.models.slot import Slot
+from app.models.notification_job import NotificationJob
+from app.services.notification_service import (
+    notify_standbys_for_slot, notify_standbys_for_slots, notify_slot_taken,
+    resend_standby_offers
+)
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryError(RuntimeError):
+    """
+    Some emails of a job were not sent. The job has already been narrowed
+    to those recipients, so the retry does not mail anyone twice.
+    """
+
+
+def enqueue_slot_notification(slot: Slot):
+    """
+    Queue a standby fan-out for a slot that just opened or reopened.
+    Only adds the job to the session; the caller's commit makes it durable
+    together with the slot change.
+    """
+    job = NotificationJob(kind='slot_opened', slot=slot)
+    db.session.add(job)
+    return job
+
+
+def enqueue_slots_notification(slot_ids):
+    """
+    Queue one batched standby fan-out for many slots opened together
+    (see notify_standbys_for_slots). The caller commits.
+    """
+    job = NotificationJob(kind='slots_opened', payload=json.dumps(list(slot_ids)))
+    db.session.add(job)
+    return job
+
+
+def enqueue_slot_taken_notification(slot_id: int, patient_ids):
+    """
+    Queue one batched "slot taken" notice for the standby patients whose
+    confirmation links for the slot were just invalidated. The caller commits.
+    """
+    job = NotificationJob(kind='slot_taken', slot_id=slot_id,
+                          payload=json.dumps(list(patient_ids)))
+    db.session.add(job)
+    return job
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """
+    Exponential backoff: base, 2*base, 4*base, ... capped at the configured max.
+    """
+    base = current_app.config["NOTIFY_RETRY_BASE_SECONDS"]
+    cap = current_app.config["NOTIFY_RETRY_MAX_SECONDS"]
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), cap))
+
+
+def claim_jobs(limit: int):
+    """
+    Move up to `limit` due jobs to 'processing' and return them.
+    Jobs stuck in 'processing' past the lock timeout (crashed worker) are reclaimed.
+    """
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=current_app.config["NOTIFY_LOCK_TIMEOUT_SECONDS"])
+
+    jobs = (
+        NotificationJob.query
+        .filter(or_(
+            and_(NotificationJob.status == 'pending',
+                 NotificationJob.next_attempt_at <= now),
+            and_(NotificationJob.status == 'processing',
+                 NotificationJob.locked_at < stale)
+        ))
+        .order_by(NotificationJob.next_attempt_at, NotificationJob.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for job in jobs:
+        job.status = 'processing'
+        job.locked_at = now
+        job.attempts += 1
+    db.session.commit()
+    return jobs
+
+
+def _run(job: NotificationJob):
+    """
+    Execute a job's fan-out and return its delivery report, or None when
+    there was nothing left to send.
+    """
+    if job.kind == 'slots_opened':
+        slot_ids = json.loads(job.payload or "[]")
+        return notify_standbys_for_slots(Slot.query.filter(Slot.id.in_(slot_ids)).all())
+
+    if job.kind == 'standby_resend':
+        return resend_standby_offers({
+            int(patient_id): tokens
+            for patient_id, tokens in json.loads(job.payload or "{}").items()
+        })
+
+    if job.kind not in ('slot_opened', 'slot_taken'):
+        raise ValueError(f"Unknown notification job kind '{job.kind}'")
+
+    slot = Slot.query.get(job.slot_id)
+    if not slot:
+        logger.info(f"Job {job.id}: slot {job.slot_id} no longer exists")
+        return None
+    if job.kind == 'slot_taken':
+        return notify_slot_taken(slot, json.loads(job.payload or "[]"))
+    return notify_standbys_for_slot(slot)
+
+
+def run_job(job: NotificationJob):
+    """
+    Execute a single outbox job. Raises on failure so the caller can retry it.
+    When only some emails fail, the job is first rewritten (and committed)
+    to cover just those recipients: standby offers become a 'standby_resend'
+    job that reuses their confirmation tokens, 'slot_taken' keeps the
+    patients still to tell.
+    """
+    report = _run(job)
+    if not report or not report["failed"]:
+        return
+
+    if job.kind == 'slot_taken':
+        job.payload = json.dumps(report["undelivered"])
+    else:
+        job.kind = 'standby_resend'
+        job.payload = json.dumps(report["undelivered"])
+    db.session.commit()
+    raise DeliveryError(f"{report['failed']} of {report['sent'] + report['failed']} emails not sent")
+
+
+def process_outbox(limit: int = None):
+    """
+    Drain one batch of due outbox jobs.
+    Returns a dict with the number of jobs done, retried and dead-lettered.
+    """
+    limit = limit or current_app.config["NOTIFY_WORKER_BATCH_SIZE"]
+    max_attempts = current_app.config["NOTIFY_MAX_ATTEMPTS"]
+    result = {"done": 0, "retried": 0, "dead": 0}
+
+    for job in claim_jobs(limit):
+        try:
+            run_job(job)
+            job.status = 'done'
+            job.last_error = None
+            result["done"] += 1
+        except Exception as err:
+            db.session.rollback()
+            job.last_error = str(err)
+            if job.attempts >= max_attempts:
+                job.status = 'dead'
+                result["dead"] += 1
+                logger.error(f"Job {job.id} dead-lettered after {job.attempts} attempts: {err}",
+                             exc_info=True)
+            else:
+                job.status = 'pending'
+                job.next_attempt_at = datetime.utcnow() + retry_delay(job.attempts)
+                result["retried"] += 1
+                logger.warning(f"Job {job.id} failed (attempt {job.attempts}), retrying: {err}")
+        job.locked_at = None
+        db.session.commit()
+
+    return result
@@ -0,0 +1,119 @@
+# backend/app/services/schedule_service.py
+
+from datetime import timedelta, time
+from flask import current_app
+from sqlalchemy import insert
+from app import db
+from app.models.slot import Slot
+from app.models.doctor import Doctor
+from app.services.outbox_service import enqueue_slots_notification
+from app.services.slot_stream_service import publish_slot_changes
+from app.utils.time_utils import WEEKDAYS, minute_of_day
+
+
+def _to_time(minutes: int) -> time:
+    return time(minutes // 60, minutes % 60)
+
+
+def day_slot_times(start: time, end: time, duration: int, breaks=()):
+    """
+    Return the (start, end) times of back-to-back slots of `duration`
+    minutes between `start` and `end`. A slot that would overlap a break
+    is moved to the end of that break.
+    `breaks` is a list of (start, end) time pairs.
+    """
+    if duration <= 0:
+        raise ValueError("slot_minutes must be positive")
+    day_end = minute_of_day(end)
+    pauses = sorted((minute_of_day(a), minute_of_day(b)) for a, b in breaks)
+
+    times = []
+    t = minute_of_day(start)
+    while t + duration <= day_end:
+        overlap = next((b for a, b in pauses if t < b and t + duration > a), None)
+        if overlap is not None:
+            t = overlap
+            continue
+        times.append((_to_time(t), _to_time(t + duration)))
+        t += duration
+    return times
+
+
+def parse_weekdays(values):
+    """
+    Accept weekday names ("Monday") or numbers (0 = Monday) and return a set of ints.
+    """
+    days = set()
+    for v in values:
+        if isinstance(v, int) and 0 <= v <= 6:
+            days.add(v)
+        elif isinstance(v, str) and v.capitalize() in WEEKDAYS:
+            days.add(WEEKDAYS.index(v.capitalize()))
+        else:
+            raise ValueError(f"Invalid weekday '{v}'")
+    return days
+
+
+def generate_schedule(doctor: Doctor, weekdays, start_time: time, end_time: time,
+                      slot_minutes: int, date_from, date_to, breaks=(),
+                      language: str = "English"):
+    """
+    Bulk-create open slots for a doctor on the given weekdays between
+    date_from and date_to (inclusive). Slots the doctor already has at the
+    same date and start time are skipped. All rows go in with one INSERT
+    (row by row where the database lacks RETURNING) and one batched standby
+    fan-out is queued for the whole set.
+    The caller commits. Returns the list of new slot ids.
+    """
+    if date_to < date_from:
+        raise ValueError("date_to must not be before date_from")
+    if (date_to - date_from).days + 1 > current_app.config["SCHEDULE_MAX_DAYS"]:
+        raise ValueError(f"Schedules may span at most {current_app.config['SCHEDULE_MAX_DAYS']} days")
+
+    day_times = day_slot_times(start_time, end_time, slot_minutes, breaks)
+
+    existing = {
+        (d, t) for d, t in db.session.query(Slot.date, Slot.start_time).filter(
+            Slot.doctor_id == doctor.id,
+            Slot.date >= date_from,
+            Slot.date <= date_to
+        )
+    }
+
+    rows = []
+    day = date_from
+    while day <= date_to:
+        if day.weekday() in weekdays:
+            for start, end in day_times:
+                if (day, start) in existing:
+                    continue
+                rows.append({
+                    "clinic_id": doctor.clinic_id,
+                    "doctor_id": doctor.id,
+                    "date": day,
+                    "start_time": start,
+                    "end_time": end,
+                    "language": language,
+                    "specialization": doctor.specialization,
+                    "status": "open",
+                })
+        day += timedelta(days=1)
+
+    if len(rows) > current_app.config["SCHEDULE_MAX_SLOTS"]:
+        raise ValueError(f"Schedule would create {len(rows)} slots; "
+                         f"the limit is {current_app.config['SCHEDULE_MAX_SLOTS']}")
+    if not rows:
+        return []
+
+    if db.session.get_bind().dialect.insert_executemany_returning:
+        slot_ids = list(db.session.scalars(insert(Slot).returning(Slot.id), rows))
+    else:
+        # No INSERT ... RETURNING (SQLite before 3.35): let the ORM insert row
+        # by row and read each id back from lastrowid.
+        slots = [Slot(**row) for row in rows]
+        db.session.add_all(slots)
+        db.session.flush()
+        slot_ids = [slot.id for slot in slots]
+    enqueue_slots_notification(slot_ids)
+    publish_slot_changes(*slot_ids)
+    return slot_ids
@@ -1,4 +1,14 @@
+import base64
+import json
+import threading
+import time as time_module
+from flask import current_app
+from sqlalchemy import func, tuple_, update, or_, and_, select, literal
+from sqlalchemy.orm import joinedload
+from app import db
 from app.models.slot import Slot
+from app.models.doctor import Doctor
+from app.models.user import Clinic
 from datetime import datetime, time
 
 
@@ -10,16 +20,25 @@ def is_slot_expired(slot: Slot) -> bool:
     return datetime.utcnow() > slot_datetime
 
 
-def expire_old_slots(slots):
+def expire_old_slots(now: datetime = None) -> int:
     """
-    Update the status of expired slots to 'expired'.
+    Mark every open slot that has already ended as 'expired' with one
+    UPDATE (served by the partial open-slots index on date) and commit.
+    Same rule as is_slot_expired(). Returns the number of slots expired.
     """
-    updated = 0
-    for slot in slots:
-        if slot.status == "open" and is_slot_expired(slot):
-            slot.status = "expired"
-            updated += 1
-    return updated
+    now = now or datetime.utcnow()
+    result = db.session.execute(
+        update(Slot)
+        .where(
+            Slot.status == "open",
+            or_(Slot.date < now.date(),
+                and_(Slot.date == now.date(), Slot.end_time < now.time()))
+        )
+        .values(status="expired")
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
 
 
 def format_slot_timeslot(start: time, end: time) -> str:
@@ -53,3 +72,183 @@ def filter_open_slots(slots, language=None, city=None):
         filtered = [s for s in filtered if s.clinic and s.clinic.city.lower() == city.lower()]
 
     return filtered
+
+
+def encode_slot_cursor(slot: Slot) -> str:
+    """
+    Opaque keyset cursor pointing just after `slot` in (date, start_time, id) order.
+    """
+    raw = json.dumps([slot.date.isoformat(), slot.start_time.strftime('%H:%M:%S'), slot.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_slot_cursor(token: str):
+    """
+    Decode a cursor from encode_slot_cursor into (date, time, id).
+    Raises ValueError if the token is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        date_s, time_s, slot_id = json.loads(raw)
+        return (datetime.strptime(date_s, "%Y-%m-%d").date(),
+                datetime.strptime(time_s, "%H:%M:%S").time(),
+                int(slot_id))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def doctors_version(clinic_id: int = None):
+    """
+    Scalar subquery summing the doctors' versions (optionally of one clinic);
+    it changes whenever a doctor is added, edited or removed.
+    Slot payloads embed doctor names, so slot ETags include it.
+    """
+    query = select(func.sum(Doctor.version))
+    if clinic_id:
+        query = query.where(Doctor.clinic_id == clinic_id)
+    return query.scalar_subquery()
+
+
+def open_slots_query(language=None, city=None, specialization=None,
+                     doctor_id=None, doctor_name=None,
+                     date_from=None, date_to=None,
+                     time_from=None, time_to=None,
+                     cursor=None):
+    """
+    Unordered query of the open slots matching the search filters,
+    starting after `cursor`. Text filters are case-insensitive;
+    doctor_name is a substring match.
+    """
+    query = Slot.query.filter(Slot.status == "open")
+
+    if language:
+        query = query.filter(func.lower(Slot.language) == language.lower())
+    if specialization:
+        query = query.filter(func.lower(Slot.specialization) == specialization.lower())
+    if city:
+        query = query.join(Clinic, Slot.clinic_id == Clinic.id) \
+                     .filter(func.lower(Clinic.city) == city.lower())
+    if doctor_id:
+        query = query.filter(Slot.doctor_id == doctor_id)
+    if doctor_name:
+        query = query.join(Doctor, Slot.doctor_id == Doctor.id) \
+                     .filter(Doctor.name.ilike(f"%{doctor_name}%"))
+    if date_from:
+        query = query.filter(Slot.date >= date_from)
+    if date_to:
+        query = query.filter(Slot.date <= date_to)
+    if time_from:
+        query = query.filter(Slot.start_time >= time_from)
+    if time_to:
+        query = query.filter(Slot.end_time <= time_to)
+    if cursor:
+        query = query.filter(
+            tuple_(Slot.date, Slot.start_time, Slot.id) > tuple_(*decode_slot_cursor(cursor))
+        )
+    return query
+
+
+def search_open_slots(limit=50, **filters):
+    """
+    Keyset-paginated search over open slots; every filter runs in SQL
+    (see open_slots_query for the filters).
+    Slots are ordered by (date, start_time, id) and `cursor` comes from
+    encode_slot_cursor. Returns (slots, next_cursor or None).
+    """
+    query = open_slots_query(**filters)
+
+    # fetch one extra row to learn whether another page exists
+    slots = (
+        query
+        .options(joinedload(Slot.doctor))
+        .order_by(Slot.date, Slot.start_time, Slot.id)
+        .limit(limit + 1)
+        .all()
+    )
+    if len(slots) > limit:
+        slots = slots[:limit]
+        return slots, encode_slot_cursor(slots[-1])
+    return slots, None
+
+
+# process-local facet cache: {filters key: (expires monotonic seconds, facets)}
+_facet_cache = {}
+_facet_cache_lock = threading.Lock()
+
+
+def compute_slot_facets(**filters):
+    """
+    Count the open slots matching the search filters (see open_slots_query;
+    no cursor) per language, specialization, city and day, in one query:
+    GROUPING SETS on Postgres, a UNION ALL of the four groupings elsewhere.
+    Returns {"total": int, "facets": {name: [{"value", "count"}, ...]}},
+    each facet ordered by count, largest first, except days in date order.
+    """
+    query = open_slots_query(**filters)
+    if not filters.get("city"):
+        query = query.join(Clinic, Slot.clinic_id == Clinic.id)
+
+    columns = {
+        "language": Slot.language,
+        "specialization": Slot.specialization,
+        "city": Clinic.city,
+        "day": Slot.date,
+    }
+    names = list(columns)
+    facets = {name: [] for name in names}
+
+    if db.session.get_bind().dialect.name == "postgresql":
+        # GROUPING() sets a bit for every column not grouped in a row's set;
+        # the first column is the highest bit
+        full = (1 << len(names)) - 1
+        position = {full ^ (1 << (len(names) - 1 - i)): i for i in range(len(names))}
+        rows = (
+            query
+            .with_entities(func.grouping(*columns.values()), *columns.values(), func.count())
+            .group_by(func.grouping_sets(*(tuple_(column) for column in columns.values())))
+            .all()
+        )
+        for mask, *values, count in rows:
+            i = position[mask]
+            facets[names[i]].append((values[i], count))
+    else:
+        queries = [
+            query.with_entities(literal(name), column, func.count()).group_by(column)
+            for name, column in columns.items()
+        ]
+        for name, value, count in queries[0].union_all(*queries[1:]).all():
+            facets[name].append((value, count))
+
+    result = {}
+    for name, counts in facets.items():
+        if name == "day":
+            counts.sort(key=lambda item: item[0])
+        else:
+            counts.sort(key=lambda item: (-item[1], str(item[0])))
+        result[name] = [
+            {"value": value.isoformat() if hasattr(value, "isoformat") else value, "count": count}
+            for value, count in counts
+        ]
+    return {"total": sum(item["count"] for item in result["language"]), "facets": result}
+
+
+def get_slot_facets(**filters):
+    """
+    compute_slot_facets(), cached per process for SLOT_FACETS_CACHE_SECONDS
+    per distinct set of filters.
+    """
+    ttl = current_app.config["SLOT_FACETS_CACHE_SECONDS"]
+    key = tuple(sorted((name, str(value)) for name, value in filters.items() if value))
+    if ttl > 0:
+        with _facet_cache_lock:
+            entry = _facet_cache.get(key)
+        if entry and entry[0] > time_module.monotonic():
+            return entry[1]
+
+    facets = compute_slot_facets(**filters)
+    if ttl > 0:
+        with _facet_cache_lock:
+            if len(_facet_cache) >= current_app.config["SLOT_FACETS_CACHE_MAX_ENTRIES"]:
+                _facet_cache.clear()
+            _facet_cache[key] = (time_module.monotonic() + ttl, facets)
+    return facets
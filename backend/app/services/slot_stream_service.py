@@ -0,0 +1,296 @@
+# backend/app/services/slot_stream_service.py
+
+"""
+Live slot deltas for the patient SSE stream (GET /api/patient/slots/stream).
+
+Code that changes a slot's status calls publish_slot_changes(slot) before
+committing. When the commit succeeds, the slots are read back with one
+query and turned into events:
+  slot.opened / slot.booked / slot.cancelled / slot.expired, or
+  slot.removed when the row no longer exists.
+On Postgres the events go out with pg_notify inside the same transaction,
+and one listener per process (LISTEN, not a thread per client) fans them
+out, so every worker process sees every change. Elsewhere (SQLite) they are
+dispatched in-process after the commit.
+
+Each subscriber has a bounded queue and its search filters; a client that
+falls behind gets a `reset` event and should re-fetch GET /api/patient/slots.
+"""
+
+import json
+import logging
+import queue
+import select as select_module
+import threading
+import time as time_module
+from sqlalchemy import event, select, func
+from sqlalchemy.orm import Session
+from app import db
+from app.models.slot import Slot
+from app.models.doctor import Doctor
+from app.models.user import Clinic
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "quickdoc_slot_events"
+# pg_notify payloads are limited to 8000 bytes
+NOTIFY_CHUNK_SIZE = 20
+
+EVENT_TYPES = {
+    "open": "slot.opened",
+    "booked": "slot.booked",
+    "cancelled": "slot.cancelled",
+    "expired": "slot.expired",
+}
+
+
+# === Publishing ===
+
+def publish_slot_changes(*slots):
+    """
+    Queue change events for the given slots (Slot objects or ids) on the
+    current session. They are published only if the session commits;
+    new Slot objects get their ids at that point.
+    """
+    db.session.info.setdefault("slot_changes", []).extend(slots)
+
+
+def _slot_events(session, slot_ids):
+    """
+    The current state of the changed slots as event dicts, one query.
+    """
+    rows = session.execute(
+        select(Slot.id, Slot.clinic_id, Slot.doctor_id, Doctor.name, Clinic.city,
+               Slot.date, Slot.start_time, Slot.end_time,
+               Slot.language, Slot.specialization, Slot.status)
+        .join(Clinic, Slot.clinic_id == Clinic.id)
+        .outerjoin(Doctor, Slot.doctor_id == Doctor.id)
+        .where(Slot.id.in_(slot_ids))
+    ).all()
+
+    events = []
+    for row in rows:
+        events.append({
+            "type": EVENT_TYPES.get(row.status, "slot.changed"),
+            "slot": {
+                "id": row.id,
+                "clinic_id": row.clinic_id,
+                "doctor_id": row.doctor_id,
+                "doctor_name": row.name,
+                "city": row.city,
+                "date": row.date.isoformat(),
+                "start_time": row.start_time.isoformat(timespec="minutes"),
+                "end_time": row.end_time.isoformat(timespec="minutes"),
+                "language": row.language,
+                "specialization": row.specialization,
+                "status": row.status,
+            },
+        })
+    found = {row.id for row in rows}
+    events.extend({"type": "slot.removed", "slot": {"id": slot_id}}
+                  for slot_id in slot_ids if slot_id not in found)
+    return events
+
+
+@event.listens_for(Session, "before_commit")
+def _collect_slot_events(session):
+    changes = session.info.pop("slot_changes", None)
+    if not changes:
+        return
+    session.flush()
+    slot_ids = list(dict.fromkeys(
+        change.id if isinstance(change, Slot) else change for change in changes
+    ))
+    events = _slot_events(session, slot_ids)
+
+    if session.get_bind().dialect.name == "postgresql":
+        # delivered by Postgres only if this transaction commits
+        for i in range(0, len(events), NOTIFY_CHUNK_SIZE):
+            session.execute(select(func.pg_notify(
+                CHANNEL, json.dumps(events[i:i + NOTIFY_CHUNK_SIZE], separators=(",", ":"))
+            )))
+    else:
+        session.info["slot_events"] = events
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_slot_events(session):
+    events = session.info.pop("slot_events", None)
+    if events:
+        broker.dispatch(events)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_slot_events(session, previous_transaction):
+    session.info.pop("slot_changes", None)
+    session.info.pop("slot_events", None)
+
+
+# === Subscribers ===
+
+def slot_event_matches(filters: dict, slot: dict) -> bool:
+    """
+    In-memory version of slot_service.open_slots_query's filters, applied to
+    an event's slot. Removed slots carry only an id and go to everyone.
+    """
+    if "status" not in slot:
+        return True
+
+    def same(value, wanted):
+        return (value or "").lower() == wanted.lower()
+
+    if filters.get("language") and not same(slot["language"], filters["language"]):
+        return False
+    if filters.get("specialization") and not same(slot["specialization"], filters["specialization"]):
+        return False
+    if filters.get("city") and not same(slot["city"], filters["city"]):
+        return False
+    if filters.get("doctor_id") and slot["doctor_id"] != filters["doctor_id"]:
+        return False
+    if filters.get("doctor_name") and filters["doctor_name"].lower() not in (slot["doctor_name"] or "").lower():
+        return False
+    # ISO strings compare in date/time order
+    if filters.get("date_from") and slot["date"] < filters["date_from"].isoformat():
+        return False
+    if filters.get("date_to") and slot["date"] > filters["date_to"].isoformat():
+        return False
+    if filters.get("time_from") and slot["start_time"] < filters["time_from"].isoformat(timespec="minutes"):
+        return False
+    if filters.get("time_to") and slot["end_time"] > filters["time_to"].isoformat(timespec="minutes"):
+        return False
+    return True
+
+
+class Subscriber:
+    """
+    One SSE client: its filters and a bounded queue of encoded events.
+    A None in the queue means it fell behind and must resynchronize.
+    """
+
+    def __init__(self, filters: dict, queue_size: int):
+        self.filters = filters
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def offer(self, frame: str):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except queue.Full:
+            self.overflowed = True
+            # make room for the reset marker
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(None)
+            except (queue.Empty, queue.Full):
+                pass
+
+
+class SlotEventBroker:
+    """
+    Process-local fan-out from published slot events to subscribers.
+    Each event is encoded once, whatever the number of subscribers.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = set()
+
+    def subscribe(self, filters: dict, queue_size: int, max_subscribers: int):
+        with self.lock:
+            if len(self.subscribers) >= max_subscribers:
+                return None
+            subscriber = Subscriber(filters, queue_size)
+            self.subscribers.add(subscriber)
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def dispatch(self, events):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        if not subscribers:
+            return
+        for evt in events:
+            frame = f"event: {evt['type']}\ndata: {json.dumps(evt['slot'], separators=(',', ':'))}\n\n"
+            for subscriber in subscribers:
+                if slot_event_matches(subscriber.filters, evt["slot"]):
+                    subscriber.offer(frame)
+
+
+broker = SlotEventBroker()
+
+
+def stream_slot_events(subscriber, heartbeat_seconds: int):
+    """
+    SSE frames for one subscriber: matching events as they arrive and a
+    comment line every heartbeat_seconds so idle connections stay open and
+    dead ones are noticed. Unsubscribes when the client goes away.
+    Holds no app context or database connection while waiting.
+    """
+    try:
+        yield f"retry: {heartbeat_seconds * 1000}\n\n"
+        while True:
+            try:
+                frame = subscriber.queue.get(timeout=heartbeat_seconds)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            if frame is None:
+                yield "event: reset\ndata: {}\n\n"
+                return
+            yield frame
+    finally:
+        broker.unsubscribe(subscriber)
+
+
+# === Postgres listener ===
+
+_listener_lock = threading.Lock()
+_listener_started = False
+
+
+def _listen(engine):
+    while True:
+        try:
+            # a dedicated connection, outside the pool
+            cargs, cparams = engine.dialect.create_connect_args(engine.url)
+            conn = engine.dialect.connect(*cargs, **cparams)
+            conn.autocommit = True
+            conn.cursor().execute(f"LISTEN {CHANNEL}")
+            while True:
+                if hasattr(conn, "poll"):
+                    # psycopg2
+                    if select_module.select([conn], [], [], 60) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        broker.dispatch(json.loads(conn.notifies.pop(0).payload))
+                else:
+                    # psycopg 3
+                    for notify in conn.notifies(timeout=60):
+                        broker.dispatch(json.loads(notify.payload))
+        except Exception:
+            logger.exception("Slot event listener failed; reconnecting")
+            time_module.sleep(5)
+
+
+def ensure_slot_event_listener(app):
+    """
+    Start this process's LISTEN loop on Postgres, once, on first use.
+    """
+    global _listener_started
+    if _listener_started:
+        return
+    with _listener_lock:
+        if _listener_started:
+            return
+        with app.app_context():
+            engine = db.engine
+        if engine.dialect.name == "postgresql":
+            threading.Thread(target=_listen, args=(engine,),
+                             name="slot-event-listener", daemon=True).start()
+        _listener_started = True
@@ -0,0 +1,122 @@
+# backend/app/services/standby_service.py
+
+import logging
+from sqlalchemy import or_
+from sqlalchemy.orm import selectinload
+from app import db
+from app.models.slot import Slot
+from app.models.user import Patient
+from app.models.dnd import DNDPreference
+from app.models.standby import StandbyPreference
+from app.models.standby_index import StandbyIndexEntry
+from app.utils.time_utils import minute_of_day
+
+logger = logging.getLogger(__name__)
+
+ALL_BUCKETS = range(24)
+
+
+def minute_buckets(start: int, end: int):
+    """
+    Return the hour-of-day buckets touched by the open minute interval (start, end).
+    Returns None when end <= start, since such a range cannot be bucketed.
+    """
+    if end <= start:
+        return None
+    return range(start // 60, (end - 1) // 60 + 1)
+
+
+def build_index_entries(pref: StandbyPreference):
+    """
+    Compute the (language, bucket) keys for a standby preference from its
+    compiled minute ranges. The keys are a superset of the slots the
+    preference can match; notify_standbys_for_slot still runs the exact
+    time and DND checks on each candidate.
+    """
+    # imported lazily: notification_service imports this module
+    from app.services.notification_service import standby_minute_ranges
+
+    langs = pref.preferred_languages.split(',') if pref.preferred_languages else [None]
+
+    buckets = set()
+    for start, end in standby_minute_ranges(pref):
+        window = minute_buckets(start, end)
+        # wrap-around windows can still overlap a long slot, so index them everywhere
+        buckets.update(window if window is not None else ALL_BUCKETS)
+
+    return [
+        StandbyIndexEntry(language=lang, bucket=bucket)
+        for lang in dict.fromkeys(langs)
+        for bucket in sorted(buckets)
+    ]
+
+
+def index_standby_preference(pref: StandbyPreference):
+    """
+    Compile the preference's time windows and replace its index entries.
+    Call whenever preferred_languages / preferred_times change. The caller commits.
+    """
+    from app.services.notification_service import compile_standby_preference
+    compile_standby_preference(pref)
+    pref.index_entries = build_index_entries(pref)
+
+
+def rebuild_standby_index():
+    """
+    Re-index every standby preference and recompile every DND preference,
+    e.g. after a migration. Returns the number of standby preferences indexed.
+    """
+    from app.services.notification_service import compile_dnd_preference
+
+    prefs = StandbyPreference.query.all()
+    for pref in prefs:
+        index_standby_preference(pref)
+    for dnd in DNDPreference.query.all():
+        compile_dnd_preference(dnd)
+    db.session.commit()
+    return len(prefs)
+
+
+def find_standby_candidates(slot: Slot):
+    """
+    Return the enabled standby preferences indexed under the slot's language
+    and time of day, ordered by preference id, with each patient and their
+    DND preference loaded.
+    """
+    return find_standby_candidates_for_slots([slot])
+
+
+def find_standby_candidates_for_slots(slots):
+    """
+    Like find_standby_candidates, but for a whole set of slots in one query:
+    preferences indexed under any of their languages and hour buckets.
+    """
+    languages = {slot.language for slot in slots}
+    query = (
+        StandbyPreference.query
+        .join(StandbyIndexEntry)
+        .filter(
+            StandbyPreference.enabled.is_(True),
+            or_(StandbyIndexEntry.language.in_(languages),
+                StandbyIndexEntry.language.is_(None))
+        )
+    )
+
+    buckets = set()
+    for slot in slots:
+        slot_buckets = minute_buckets(minute_of_day(slot.start_time), minute_of_day(slot.end_time))
+        if slot_buckets is None:
+            logger.debug(f"Slot {slot.id} has no bucketable time range; matching on language only")
+            buckets = None
+            break
+        buckets.update(slot_buckets)
+    if buckets is not None:
+        query = query.filter(StandbyIndexEntry.bucket.in_(sorted(buckets)))
+
+    return (
+        query
+        .options(selectinload(StandbyPreference.patient).selectinload(Patient.dnd))
+        .distinct()
+        .order_by(StandbyPreference.id)
+        .all()
+    )
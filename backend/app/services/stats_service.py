@@ -0,0 +1,64 @@
+# backend/app/services/stats_service.py
+
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select, func
+from app import db
+from app.models.user import Patient, Clinic, Admin
+from app.models.slot import Slot
+from app.models.booking import Booking
+
+# process-local cache: {"expires": monotonic seconds, "stats": dict}
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _count(table):
+    return select(func.count()).select_from(table).scalar_subquery()
+
+
+def compute_dashboard_stats():
+    """
+    Compute every admin dashboard counter in a single aggregate query.
+    """
+    slots = Slot.__table__
+    query = select(
+        _count(Patient.__table__).label("total_patients"),
+        _count(Clinic.__table__).label("total_clinics"),
+        _count(Admin.__table__).label("total_admins"),
+        func.count(slots.c.id).label("total_slots"),
+        func.count(slots.c.id).filter(slots.c.status == "open").label("open_slots"),
+        func.count(slots.c.id).filter(slots.c.status == "booked").label("booked_slots"),
+        func.count(slots.c.id).filter(slots.c.status == "cancelled").label("cancelled_slots"),
+        _count(Booking.__table__).label("total_bookings"),
+    ).select_from(slots)
+
+    row = db.session.execute(query).mappings().one()
+    stats = dict(row)
+    stats["as_of"] = datetime.utcnow().isoformat()
+    return stats
+
+
+def get_dashboard_stats():
+    """
+    Return the admin dashboard counters, recomputed at most once every
+    ADMIN_STATS_CACHE_SECONDS per process. `as_of` tells when they were taken.
+    """
+    ttl = current_app.config["ADMIN_STATS_CACHE_SECONDS"]
+    with _cache_lock:
+        if _cache and _cache["expires"] > time.monotonic():
+            return _cache["stats"]
+        stats = compute_dashboard_stats()
+        _cache["stats"] = stats
+        _cache["expires"] = time.monotonic() + ttl
+        return stats
+
+
+def invalidate_dashboard_stats():
+    """
+    Drop the cached dashboard counters so the next request recomputes them.
+    """
+    with _cache_lock:
+        _cache.clear()
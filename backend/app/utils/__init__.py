@@ -4,3 +4,6 @@
 from .jwt import *
 from .validators import *
 from .time_utils import *
+from .etag import *
+from .streaming import *
+from .json_provider import *
@@ -0,0 +1,47 @@
+import hashlib
+from flask import request, make_response
+from sqlalchemy import func
+
+
+def query_fingerprint(query, model, *extra):
+    """
+    (row count, sum(id), sum(version), *extra) of the rows a query
+    selects, in one aggregate query with no rows loaded. `model` needs a
+    `version` column that every UPDATE bumps: an update raises sum(version),
+    and since ids only grow, an insert or delete changes the count or sum(id).
+    (max(updated_at) is not enough: two updates in the same timestamp tick
+    leave it unchanged.) `extra` are scalar subqueries for related data the
+    payload embeds.
+    """
+    row = (
+        query.order_by(None)
+        .with_entities(func.count(model.id), func.sum(model.id),
+                       func.sum(model.version), *extra)
+        .one()
+    )
+    return tuple(v.isoformat() if hasattr(v, "isoformat") else v for v in row)
+
+
+def weak_etag(*parts) -> str:
+    """
+    Opaque ETag value derived from the given parts (fingerprints, ids, query string).
+    """
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:24]
+
+
+def not_modified(etag: str):
+    """
+    A 304 response if the request's If-None-Match matches `etag`, else None.
+    """
+    if request.if_none_match.contains_weak(etag):
+        return with_etag(make_response("", 304), etag)
+    return None
+
+
+def with_etag(response, etag: str):
+    """
+    Attach a weak ETag; clients must revalidate on every poll.
+    """
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,56 @@
+import dataclasses
+import decimal
+import uuid
+from datetime import date, time
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency; stdlib json is used instead
+    orjson = None
+
+
+def _default(o):
+    """
+    Fallback serializer: dates, datetimes and times as ISO 8601
+    (the same strings orjson writes), then Flask's usual extras.
+    """
+    if isinstance(o, (date, time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class QuickDocJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes with orjson when it is installed (and
+    JSON_USE_ORJSON is on) and with the stdlib otherwise. Either way
+    date, datetime and time values are written as ISO 8601 strings, so
+    to_dict() methods can return them as-is.
+    """
+
+    default = staticmethod(_default)
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.use_orjson = orjson is not None and app.config.get("JSON_USE_ORJSON", True)
+
+    def dumps(self, obj, **kwargs):
+        if not self.use_orjson:
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if not self.use_orjson:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
@@ -1,25 +1,65 @@
-from flask_jwt_extended import get_jwt_identity
+from flask import g
+from flask_jwt_extended import get_jwt, get_jwt_identity
+
+
+class Principal:
+    """
+    The authenticated caller, built from the JWT of the current request.
+    `id`, `role` and `email` come straight from the token claims;
+    `user` loads the full row on first access (through the user cache).
+    """
+
+    def __init__(self, user_id: int, role: str, email: str = None):
+        self.id = user_id
+        self.role = role
+        self.email = email
+        self.claims = None
+        self._user = None
+        self._loaded = False
+
+    @property
+    def user(self):
+        if not self._loaded:
+            from app.services.auth_service import get_cached_user
+            self._user = get_cached_user(self.id, self.role)
+            self._loaded = True
+        return self._user
+
+    def is_role(self, role: str) -> bool:
+        return self.role == role
+
+
+def current_principal() -> Principal:
+    """
+    Returns the Principal of the current request, built once per request.
+    Must be called inside a @jwt_required() view.
+    """
+    claims = get_jwt()
+    principal = g.get("principal")
+    # g outlives the request when an app context was pushed around it
+    if principal is None or principal.claims is not claims:
+        principal = Principal(int(get_jwt_identity()), claims.get("role"), claims.get("email"))
+        principal.claims = claims
+        g.principal = principal
+    return principal
 
 
 def get_current_user_id():
     """
     Returns the current user's ID from JWT identity.
     """
-    identity = get_jwt_identity()
-    return identity.get("id") if identity else None
+    return current_principal().id
 
 
 def get_current_user_role():
     """
-    Returns the current user's role from JWT identity.
+    Returns the current user's role from the JWT claims.
     """
-    identity = get_jwt_identity()
-    return identity.get("role") if identity else None
+    return current_principal().role
 
 
 def is_role(role: str):
     """
     Check if the current user has a specific role.
     """
-    identity = get_jwt_identity()
-    return identity and identity.get("role") == role
+    return current_principal().is_role(role)
@@ -0,0 +1,38 @@
+import logging
+from flask import Response, current_app, stream_with_context
+
+logger = logging.getLogger(__name__)
+
+
+def stream_json_list(query, serialize, batch_size: int = None):
+    """
+    Stream `[serialize(row), ...]` for every row of an ORM query as a JSON
+    array, without building the list in memory. Rows are fetched
+    STREAM_YIELD_PER at a time through yield_per (a server-side cursor on
+    PostgreSQL) and each batch is written out as one chunk, so memory stays
+    flat however many rows match.
+    Only many-to-one eager loads (joinedload) may be combined with this.
+    """
+    batch_size = batch_size or current_app.config["STREAM_YIELD_PER"]
+    dumps = current_app.json.dumps
+
+    def generate():
+        yield "["
+        first = True
+        chunk = []
+        try:
+            for row in query.yield_per(batch_size):
+                chunk.append(dumps(serialize(row), separators=(",", ":")))
+                if len(chunk) >= batch_size:
+                    yield ("" if first else ",") + ",".join(chunk)
+                    first = False
+                    chunk = []
+            if chunk:
+                yield ("" if first else ",") + ",".join(chunk)
+        except Exception:
+            # headers are already sent; the client sees a truncated array
+            logger.error("Streaming JSON response failed", exc_info=True)
+            raise
+        yield "]"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
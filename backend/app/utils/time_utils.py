@@ -1,3 +1,4 @@
+import struct
 from datetime import datetime, time, timedelta
 
 
@@ -42,3 +43,52 @@ def is_slot_in_future(slot_date: datetime.date, slot_time: time) -> bool:
     """
     slot_datetime = datetime.combine(slot_date, slot_time)
     return slot_datetime > datetime.utcnow()
+
+
+# === Compiled time windows ===
+# Preferences store their windows as packed (start, end) minute-of-day pairs
+# and their days as a Monday=bit0 weekday mask, so matching is integer math.
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+_MINUTE_PAIR = struct.Struct("<HH")
+
+
+def minute_of_day(t: time) -> int:
+    """
+    Returns the minute of the day (0-1439) for a time object.
+    """
+    return t.hour * 60 + t.minute
+
+
+def weekday_mask(day_names) -> int:
+    """
+    Build a weekday bitmask from English day names (Monday = bit 0).
+    Unknown names are ignored.
+    """
+    mask = 0
+    for name in day_names:
+        if name in WEEKDAYS:
+            mask |= 1 << WEEKDAYS.index(name)
+    return mask
+
+
+def pack_minute_ranges(ranges) -> bytes:
+    """
+    Pack (start_minute, end_minute) pairs into bytes for storage.
+    """
+    return b"".join(_MINUTE_PAIR.pack(start, end) for start, end in ranges)
+
+
+def unpack_minute_ranges(blob: bytes):
+    """
+    Unpack bytes written by pack_minute_ranges into (start, end) pairs.
+    """
+    return list(_MINUTE_PAIR.iter_unpack(blob))
+
+
+def overlaps_minute_ranges(ranges, start: int, end: int) -> bool:
+    """
+    True if (start, end) overlaps any range, using the same strict
+    comparison as the time-object checks: start < r_end and end > r_start.
+    """
+    return any(start < r_end and end > r_start for r_start, r_end in ranges)
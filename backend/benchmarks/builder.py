@@ -0,0 +1,146 @@
+# backend/benchmarks/builder.py
+
+"""
+Synthetic data for the benchmark suite.
+
+Starts from the regular seed (database/seed_data.py), so its accounts
+(patient1@example.com / testpass, admin@quickdoc.com / adminpass, ...) exist,
+then adds clinics, doctors, patients with standby/DND preferences and open
+slots built from the same models, scaled by BENCH_SCALE.
+"""
+
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, time
+
+from sqlalchemy import insert
+from app import db
+from app.models.user import Patient, Clinic
+from app.models.doctor import Doctor
+from app.models.slot import Slot
+from app.models.standby import StandbyPreference
+from app.models.dnd import DNDPreference
+from app.services.auth_service import hash_password
+from app.services.standby_service import index_standby_preference
+from app.services.notification_service import compile_dnd_preference
+from database.seed_data import seed
+
+CITIES = ["Berlin", "Munich", "Hamburg", "Cologne", "Frankfurt"]
+LANGUAGES = ["English", "German", "Turkish", "Arabic", "Spanish"]
+SPECIALIZATIONS = ["General Practitioner", "Cardiologist", "Dermatologist",
+                   "Pediatrician", "Psychotherapist"]
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# every synthetic account shares this password; hashed once
+PASSWORD = "benchpass"
+
+
+@dataclass
+class Dataset:
+    clinics: int = 0
+    doctors: int = 0
+    patients: int = 0
+    slots: int = 0
+    standby: int = 0
+    hot_slot_id: int = None        # an open slot most standby patients match
+    patient_email: str = "patient1@example.com"
+    clinic_email: str = "clinic1@quickdoc.com"
+    admin_email: str = "admin@quickdoc.com"
+    passwords: dict = field(default_factory=lambda: {
+        "patient1@example.com": "testpass",
+        "clinic1@quickdoc.com": "password123",
+        "admin@quickdoc.com": "adminpass",
+    })
+
+
+def build_dataset(scale: int = 1, seed_value: int = 42) -> Dataset:
+    """
+    Drop and recreate the schema, run the regular seed, then add
+    scale x (20 clinics, 60 doctors, 1000 patients, 5000 slots).
+    Half of the synthetic patients have a standby preference; a fifth of
+    those also have DND rules. Deterministic for a given seed_value.
+    """
+    rng = random.Random(seed_value)
+    seed()
+
+    password_hash = hash_password(PASSWORD)
+    today = datetime.utcnow().date()
+    data = Dataset()
+
+    clinics = [
+        Clinic(email=f"bench-clinic{i}@quickdoc.test", password_hash=password_hash,
+               name=f"Bench Clinic {i}", city=CITIES[i % len(CITIES)])
+        for i in range(20 * scale)
+    ]
+    db.session.add_all(clinics)
+    db.session.flush()
+
+    doctors = [
+        Doctor(clinic_id=clinics[i % len(clinics)].id, name=f"Dr. Bench {i}",
+               specialization=SPECIALIZATIONS[i % len(SPECIALIZATIONS)],
+               languages=",".join(rng.sample(LANGUAGES, 2)))
+        for i in range(60 * scale)
+    ]
+    db.session.add_all(doctors)
+    db.session.flush()
+
+    patients = [
+        Patient(email=f"bench-patient{i}@quickdoc.test", password_hash=password_hash,
+                name=f"Patient {i}", language=rng.choice(LANGUAGES),
+                location=rng.choice(CITIES))
+        for i in range(1000 * scale)
+    ]
+    db.session.add_all(patients)
+    db.session.flush()
+
+    for i, patient in enumerate(patients[::2]):
+        start = rng.randrange(7, 16)
+        pref = StandbyPreference(
+            patient_id=patient.id,
+            enabled=True,
+            preferred_languages=",".join(rng.sample(LANGUAGES, rng.randint(1, 2))),
+            preferred_days=",".join(rng.sample(WEEKDAYS, 3)),
+            preferred_times=f"{start:02d}:00-{start + rng.randint(2, 4):02d}:00",
+            max_notifications_per_day=5,
+        )
+        index_standby_preference(pref)
+        db.session.add(pref)
+        data.standby += 1
+        if i % 5 == 0:
+            dnd = DNDPreference(
+                patient_id=patient.id,
+                dnd_days=rng.choice(WEEKDAYS),
+                dnd_time_ranges='[{"from": "12:00", "to": "13:00"}]',
+                temporarily_paused=False,
+            )
+            compile_dnd_preference(dnd)
+            db.session.add(dnd)
+
+    slot_rows = []
+    for i in range(5000 * scale):
+        doctor = doctors[i % len(doctors)]
+        start = rng.randrange(8, 17)
+        slot_rows.append(dict(
+            clinic_id=doctor.clinic_id, doctor_id=doctor.id,
+            date=today + timedelta(days=rng.randrange(1, 60)),
+            start_time=time(start, 0), end_time=time(start, 30),
+            language=rng.choice(LANGUAGES), specialization=doctor.specialization,
+            status="open",
+        ))
+    db.session.execute(insert(Slot), slot_rows)
+
+    # a weekday morning English slot: the widest standby audience
+    hot = Slot(clinic_id=doctors[0].clinic_id, doctor_id=doctors[0].id,
+               date=today + timedelta(days=7 - today.weekday()),
+               start_time=time(10, 0), end_time=time(10, 30),
+               language="English", specialization=doctors[0].specialization,
+               status="open")
+    db.session.add(hot)
+    db.session.commit()
+
+    data.clinics = len(clinics)
+    data.doctors = len(doctors)
+    data.patients = len(patients)
+    data.slots = len(slot_rows) + 1
+    data.hot_slot_id = hot.id
+    return data
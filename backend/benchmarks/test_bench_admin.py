@@ -0,0 +1,41 @@
+# backend/benchmarks/test_bench_admin.py
+
+from app.services.stats_service import compute_dashboard_stats, invalidate_dashboard_stats
+
+
+def test_dashboard_stats_query(benchmark, app_ctx):
+    """
+    The single aggregate query behind the dashboard, uncached.
+    """
+    stats = benchmark(compute_dashboard_stats)
+    assert stats["total_slots"] > 0
+
+
+def test_admin_dashboard_endpoint(benchmark, client, admin_headers):
+    """
+    GET /api/admin/dashboard as clients see it (served from the TTL cache).
+    """
+    def dashboard():
+        r = client.get("/api/admin/dashboard", headers=admin_headers)
+        assert r.status_code == 200
+
+    benchmark(dashboard)
+
+
+def test_admin_dashboard_endpoint_cold(benchmark, app, client, admin_headers):
+    def dashboard():
+        with app.app_context():
+            invalidate_dashboard_stats()
+        r = client.get("/api/admin/dashboard", headers=admin_headers)
+        assert r.status_code == 200
+
+    benchmark(dashboard)
+
+
+def test_admin_patient_export(benchmark, client, admin_headers):
+    def export():
+        r = client.get("/api/admin/users/patients", headers=admin_headers)
+        assert r.status_code == 200
+        return len(r.data)
+
+    benchmark(export)
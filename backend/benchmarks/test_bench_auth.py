@@ -0,0 +1,28 @@
+# backend/benchmarks/test_bench_auth.py
+
+"""
+Login cost is dominated by password hashing (PASSWORD_HASH_METHOD), so
+these run a fixed, small number of rounds.
+"""
+
+from benchmarks.builder import PASSWORD
+
+
+def test_login(benchmark, app, client, dataset):
+    benchmark.extra_info["hash_method"] = app.config["PASSWORD_HASH_METHOD"]
+
+    def login():
+        r = client.post("/api/auth/login",
+                        json={"email": "bench-patient0@quickdoc.test", "password": PASSWORD})
+        assert r.status_code == 200
+
+    benchmark.pedantic(login, rounds=5, warmup_rounds=1)
+
+
+def test_login_wrong_password(benchmark, client, dataset):
+    def login():
+        r = client.post("/api/auth/login",
+                        json={"email": "bench-patient1@quickdoc.test", "password": "nope"})
+        assert r.status_code == 401
+
+    benchmark.pedantic(login, rounds=5)
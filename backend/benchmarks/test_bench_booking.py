@@ -0,0 +1,74 @@
+# backend/benchmarks/test_bench_booking.py
+
+import uuid
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.slot import Slot
+from app.models.user import Patient
+from app.models.slot_confirmation import SlotConfirmation
+
+
+def _open_slot_ids(app, dataset, count):
+    # newest first, leaving the standby fan-out slot alone
+    with app.app_context():
+        return [
+            row.id for row in
+            Slot.query.filter(Slot.status == "open", Slot.id != dataset.hot_slot_id)
+            .order_by(Slot.id.desc()).limit(count)
+        ]
+
+
+def test_patient_book_slot(benchmark, app, dataset, client, patient_headers):
+    """
+    POST /api/patient/book/<id>: the conditional-UPDATE booking primitive
+    behind the route; every round books a different open slot.
+    """
+    slot_ids = iter(_open_slot_ids(app, dataset, 200))
+
+    def setup():
+        return (next(slot_ids),), {}
+
+    def book(slot_id):
+        r = client.post(f"/api/patient/book/{slot_id}", headers=patient_headers)
+        assert r.status_code == 200, r.get_json()
+
+    benchmark.pedantic(book, setup=setup, rounds=50)
+
+
+def test_patient_book_taken_slot(benchmark, app, dataset, client, patient_headers):
+    """
+    The losing side of a race: the slot is already booked.
+    """
+    slot_id = _open_slot_ids(app, dataset, 1)[0]
+    client.post(f"/api/patient/book/{slot_id}", headers=patient_headers)
+
+    def book():
+        r = client.post(f"/api/patient/book/{slot_id}", headers=patient_headers)
+        assert r.status_code == 400
+
+    benchmark(book)
+
+
+def test_confirm_link(benchmark, app, dataset, client):
+    """
+    GET /confirm?token=...: a standby patient claiming a slot from an email.
+    """
+    slot_ids = iter(_open_slot_ids(app, dataset, 200))
+    with app.app_context():
+        patient_id = Patient.query.filter_by(email="patient2@example.com").one().id
+
+    def setup():
+        token = str(uuid.uuid4())
+        with app.app_context():
+            db.session.add(SlotConfirmation(
+                token=token, slot_id=next(slot_ids), patient_id=patient_id,
+                expires_at=datetime.utcnow() + timedelta(hours=2)))
+            db.session.commit()
+        return (token,), {}
+
+    def confirm(token):
+        r = client.get(f"/confirm?token={token}")
+        assert r.status_code == 200 and "confirmed" in r.get_data(as_text=True)
+
+    benchmark.pedantic(confirm, setup=setup, rounds=50)
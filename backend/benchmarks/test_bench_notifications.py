@@ -0,0 +1,32 @@
+# backend/benchmarks/test_bench_notifications.py
+
+from app import db
+from app.models.slot import Slot
+from app.models.slot_confirmation import SlotConfirmation
+from app.models.notification_counter import NotificationCounter
+from app.services.notification_service import notify_standbys_for_slot
+from app.services.standby_service import find_standby_candidates
+
+
+def test_find_standby_candidates(benchmark, app_ctx, dataset):
+    slot = db.session.get(Slot, dataset.hot_slot_id)
+    prefs = benchmark(find_standby_candidates, slot)
+    assert prefs
+
+
+def test_notify_standbys_for_slot(benchmark, app_ctx, dataset):
+    """
+    Full fan-out for one slot: matching, daily caps, token insert and
+    (suppressed) mail. Counters are reset each round so no one hits the cap.
+    """
+    slot = db.session.get(Slot, dataset.hot_slot_id)
+
+    def clear_tokens():
+        SlotConfirmation.query.filter_by(slot_id=slot.id).delete()
+        NotificationCounter.query.delete()
+        db.session.commit()
+
+    report = benchmark.pedantic(notify_standbys_for_slot, args=(slot,),
+                                setup=clear_tokens, rounds=10)
+    assert report["sent"] > 0 and report["suppressed"] == 0
+    benchmark.extra_info["recipients"] = report["sent"]
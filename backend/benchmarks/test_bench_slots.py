@@ -0,0 +1,58 @@
+# backend/benchmarks/test_bench_slots.py
+
+import pytest
+
+
+@pytest.mark.parametrize("query", [
+    "",
+    "?language=English&city=Berlin",
+    "?specialization=Cardiologist&time_from=09:00&time_to=12:00",
+    "?limit=200",
+], ids=["first-page", "language-city", "specialization-hours", "page-200"])
+def test_patient_slot_search(benchmark, client, patient_headers, query):
+    def search():
+        r = client.get(f"/api/patient/slots{query}", headers=patient_headers)
+        assert r.status_code == 200
+        return r
+
+    benchmark(search)
+
+
+def test_patient_slot_search_not_modified(benchmark, client, patient_headers):
+    etag = client.get("/api/patient/slots", headers=patient_headers).headers["ETag"]
+    headers = {**patient_headers, "If-None-Match": etag}
+
+    def poll():
+        r = client.get("/api/patient/slots", headers=headers)
+        assert r.status_code == 304
+
+    benchmark(poll)
+
+
+@pytest.mark.parametrize("query", [
+    "",
+    "?language=English&city=Berlin",
+], ids=["all-open", "language-city"])
+def test_patient_slot_facets(benchmark, app, client, patient_headers, query):
+    """
+    Facet counts computed on every call (the per-process cache is off).
+    """
+    app.config["SLOT_FACETS_CACHE_SECONDS"] = 0
+
+    def facets():
+        r = client.get(f"/api/patient/slots/facets{query}", headers=patient_headers)
+        assert r.status_code == 200
+        return r
+
+    try:
+        benchmark(facets)
+    finally:
+        app.config["SLOT_FACETS_CACHE_SECONDS"] = 5
+
+
+def test_clinic_slot_list(benchmark, client, clinic_headers):
+    def list_slots():
+        r = client.get("/api/clinic/slots", headers=clinic_headers)
+        assert r.status_code == 200
+
+    benchmark(list_slots)
@@ -3,6 +3,7 @@
 import sys
 import os
 from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
 
 # ensure app package is on PYTHONPATH
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), 'app')))
@@ -14,11 +15,55 @@ from app.models.slot import Slot
 from app.models.booking import Booking
 from app.models.standby import StandbyPreference
 from app.models.dnd import DNDPreference
+from app.models.notification_job import NotificationJob
+from app.models.notification_counter import NotificationCounter
+from app.services.standby_service import rebuild_standby_index
+
+def add_missing_columns(engine, inspector, model, names):
+    """
+    ALTER TABLE ... ADD COLUMN for any of the model's columns that an
+    existing table does not have yet. Columns must be nullable or have a
+    server default to fill existing rows.
+    """
+    table = model.__table__
+    if not inspector.has_table(table.name):
+        return  # create_all() will create it with every column
+    existing = {col['name'] for col in inspector.get_columns(table.name)}
+    for name in names:
+        if name in existing:
+            continue
+        ddl = CreateColumn(table.c[name]).compile(dialect=engine.dialect)
+        print(f"🔨 Adding missing column {table.name}.{name}…")
+        db.session.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+        db.session.commit()
+        print(f"✅ Added {table.name}.{name}")
+
+
+def create_missing_indexes(engine):
+    """
+    CREATE INDEX for every index declared on the models that an existing
+    table does not have yet (create_all() only indexes tables it creates).
+    """
+    inspector = inspect(engine)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            print(f"🔨 Creating index {index.name} on {table.name}…")
+            index.create(bind=engine)
+            print(f"✅ Created {index.name}")
+
 
 def migrate():
     """
-    1) Adds slots.doctor_id if missing
-    2) Creates any other tables/models via create_all()
+    1) Adds slots.doctor_id, the compiled preference columns, the
+       outbox payload column and the slot/doctor version columns if missing
+    2) Creates any other tables/models via create_all(), then any
+       model-declared indexes missing from existing tables
+    3) Backfills the standby matching index and compiled time windows
     """
     engine = db.get_engine()
     inspector = inspect(engine)
@@ -37,12 +82,33 @@ def migrate():
         db.session.commit()
         print("✅ Added slots.doctor_id")
 
+    # 1b) Compiled standby / DND time windows
+    add_missing_columns(engine, inspector, StandbyPreference, ['preferred_minutes'])
+    add_missing_columns(engine, inspector, DNDPreference, ['dnd_day_mask', 'dnd_minutes'])
+
+    # 1c) Batched outbox jobs carry a payload instead of a single slot
+    add_missing_columns(engine, inspector, NotificationJob, ['payload'])
+    if inspector.has_table('notification_outbox') and engine.dialect.name == 'postgresql':
+        db.session.execute(text("ALTER TABLE notification_outbox ALTER COLUMN slot_id DROP NOT NULL"))
+        db.session.commit()
+
+    # 1d) Row versions for the list ETags
+    add_missing_columns(engine, inspector, Slot, ['version'])
+    add_missing_columns(engine, inspector, Doctor, ['version'])
+
     # 2) Create any other tables (new models)
     try:
         db.create_all()
         print("✅ All tables are now up to date.")
     except Exception as e:
         print("❌ Migration/create_all failed:", str(e))
+        return
+
+    create_missing_indexes(engine)
+
+    # 3) Index and compile preferences saved before the index existed
+    count = rebuild_standby_index()
+    print(f"✅ Indexed {count} standby preferences")
 
 if __name__ == "__main__":
     # spin up Flask app context
@@ -8,6 +8,8 @@ from app.models.doctor import Doctor
 from app.models.slot import Slot
 from app.models.standby import StandbyPreference
 from app.models.dnd import DNDPreference
+from app.services.standby_service import index_standby_preference
+from app.services.notification_service import compile_dnd_preference
 from datetime import datetime, timedelta, time
 
 def seed():
@@ -126,6 +128,7 @@ def seed():
         preferred_times="08:00-12:00",
         max_notifications_per_day=3
     )
+    index_standby_preference(standby1)
 
     dnd2 = DNDPreference(
         patient_id=patient2.id,
@@ -133,6 +136,7 @@ def seed():
         dnd_time_ranges='[{"from": "14:00", "to": "16:00"}]',
         temporarily_paused=False
     )
+    compile_dnd_preference(dnd2)
 
     db.session.add_all([standby1, dnd2])
     db.session.commit()
@@ -0,0 +1,31 @@
+# backend/gunicorn.conf.py
+
+"""
+Production server settings (used by the Dockerfile):
+    gunicorn --config gunicorn.conf.py "app:create_app()"
+
+gevent workers serve each request, including every open
+/api/patient/slots/stream client, on a greenlet instead of an OS thread.
+"""
+
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+worker_class = "gevent"
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+# concurrent clients per worker; keep SLOT_STREAM_MAX_SUBSCRIBERS below it
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 5000))
+# SSE responses stay open; the heartbeat keeps them from looking idle
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+accesslog = "-"
+
+
+def post_fork(server, worker):
+    # the gevent worker monkey-patches the standard library, but psycopg2
+    # waits on the socket in C and would block every greenlet of the worker
+    try:
+        import psycopg2  # noqa: F401
+    except ImportError:
+        return  # SQLite or another driver; nothing to patch
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
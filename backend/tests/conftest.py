@@ -0,0 +1,107 @@
+# backend/tests/conftest.py
+
+"""
+Fixtures for the test suite (pytest).
+
+Every test starts from an empty schema in a temp-file SQLite database; a
+file rather than :memory: so that threads in the concurrency tests share
+it. Requests run outside any app context, so each one gets its own
+session, as in production.
+"""
+
+import os
+import sys
+import tempfile
+from dataclasses import dataclass
+
+import pytest
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND)
+
+_db_file = os.path.join(tempfile.gettempdir(), "quickdoc_test.db")
+# Config reads the environment at import time, so set it before importing the app
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}"
+os.environ.setdefault("MAINTENANCE_SCHEDULER_ENABLED", "false")
+os.environ.setdefault("NPLUSONE_DETECTION", "raise")
+
+from app import create_app, db  # noqa: E402
+from app.models.user import Patient, Clinic  # noqa: E402
+from app.models.doctor import Doctor  # noqa: E402
+from app.services.auth_service import hash_password, clear_user_cache  # noqa: E402
+from app.services.stats_service import invalidate_dashboard_stats  # noqa: E402
+
+PASSWORD = "testpass"
+
+
+@dataclass
+class Accounts:
+    clinic_id: int
+    doctor_id: int
+    patient_id: int
+    clinic_headers: dict
+    patient_headers: dict
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.config.update(TESTING=True, MAIL_SUPPRESS_SEND=True,
+                      MAIL_DEFAULT_SENDER="test@quickdoc.test")
+    # Flask-Mail reads `suppress` when it is initialized
+    app.extensions["mail"].suppress = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+    invalidate_dashboard_stats()
+    clear_user_cache()
+    return app.test_client()
+
+
+def login(client, email):
+    r = client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+    assert r.status_code == 200, r.get_json()
+    return {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+
+
+def add_patient(email, name="Test Patient"):
+    """
+    Create a patient (password PASSWORD) and return its id. Needs an app context.
+    """
+    patient = Patient(email=email, password_hash=hash_password(PASSWORD),
+                      name=name, language="English", location="Berlin")
+    db.session.add(patient)
+    db.session.commit()
+    return patient.id
+
+
+@pytest.fixture
+def accounts(app, client):
+    """
+    A clinic with one doctor and a patient, both logged in.
+    """
+    with app.app_context():
+        clinic = Clinic(email="clinic@quickdoc.test", password_hash=hash_password(PASSWORD),
+                        name="Test Clinic", city="Berlin")
+        db.session.add(clinic)
+        db.session.flush()
+        doctor = Doctor(clinic_id=clinic.id, name="Dr. Test",
+                        specialization="Dentist", languages="English")
+        db.session.add(doctor)
+        db.session.commit()
+        clinic_id, doctor_id = clinic.id, doctor.id
+        patient_id = add_patient("patient@quickdoc.test")
+
+    return Accounts(
+        clinic_id=clinic_id,
+        doctor_id=doctor_id,
+        patient_id=patient_id,
+        clinic_headers=login(client, "clinic@quickdoc.test"),
+        patient_headers=login(client, "patient@quickdoc.test"),
+    )
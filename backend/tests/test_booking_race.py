@@ -0,0 +1,87 @@
+# backend/tests/test_booking_race.py
+
+"""
+Concurrent standby confirmations for one slot: the conditional UPDATE in
+book_slot_for_patient lets exactly one of them book it.
+"""
+
+import threading
+from datetime import datetime, timedelta, time
+
+from app import db
+from app.models.slot import Slot
+from app.models.booking import Booking
+from app.models.slot_confirmation import SlotConfirmation
+from app.routes import confirm as confirm_route
+from tests.conftest import add_patient
+
+CONFIRMERS = 10
+SUCCESS = "Your appointment is confirmed"
+TAKEN = "that slot has already been booked"
+ALREADY_BOOKED = "You have already booked this appointment"
+
+
+def test_concurrent_confirmations_book_the_slot_once(app, client, accounts, monkeypatch):
+    with app.app_context():
+        slot = Slot(clinic_id=accounts.clinic_id, doctor_id=accounts.doctor_id,
+                    date=datetime.utcnow().date() + timedelta(days=1),
+                    start_time=time(9), end_time=time(9, 30),
+                    language="English", status="open")
+        db.session.add(slot)
+        db.session.flush()
+        confirmations = [
+            SlotConfirmation(slot_id=slot.id, patient_id=add_patient(f"standby{i}@quickdoc.test"),
+                             expires_at=datetime.utcnow() + timedelta(hours=2), used=False)
+            for i in range(CONFIRMERS)
+        ]
+        db.session.add_all(confirmations)
+        db.session.commit()
+        slot_id = slot.id
+        tokens = [c.token for c in confirmations]
+
+    # record what the booking primitive returned: a loser must have lost the
+    # race, not failed with e.g. "database is locked" (also rendered "taken")
+    outcomes = []
+    book = confirm_route.book_slot_for_patient
+
+    def spy(patient_id, slot_id):
+        success, message, booking = book(patient_id, slot_id)
+        outcomes.append((success, message))
+        return success, message, booking
+
+    monkeypatch.setattr(confirm_route, "book_slot_for_patient", spy)
+
+    barrier = threading.Barrier(CONFIRMERS)
+    pages = [None] * CONFIRMERS
+
+    def confirm(i):
+        thread_client = app.test_client()
+        barrier.wait()
+        r = thread_client.get(f"/confirm?token={tokens[i]}")
+        pages[i] = (r.status_code, r.get_data(as_text=True))
+
+    threads = [threading.Thread(target=confirm, args=(i,)) for i in range(CONFIRMERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(status == 200 for status, _ in pages), pages
+    # confirmations arriving after the winner committed find their token
+    # already invalidated and never reach the booking primitive
+    assert [success for success, _ in outcomes].count(True) == 1
+    assert {message for success, message in outcomes if not success} <= {"Slot is no longer available."}, outcomes
+    assert sum(SUCCESS in body for _, body in pages) == 1
+    assert sum(TAKEN in body for _, body in pages) == CONFIRMERS - 1
+
+    with app.app_context():
+        bookings = Booking.query.filter_by(slot_id=slot_id).all()
+        assert len(bookings) == 1
+        assert db.session.get(Slot, slot_id).status == "booked"
+        winner = tokens[[SUCCESS in body for _, body in pages].index(True)]
+        assert db.session.get(SlotConfirmation, winner).patient_id == bookings[0].patient_id
+
+    # clicking again: the booker is told they hold it, everyone else that it is gone
+    for token in tokens:
+        body = client.get(f"/confirm?token={token}").get_data(as_text=True)
+        assert (ALREADY_BOOKED if token == winner else TAKEN) in body
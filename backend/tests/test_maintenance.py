@@ -0,0 +1,58 @@
+# backend/tests/test_maintenance.py
+
+"""
+Maintenance keeps used confirmation tokens until TOKEN_RETENTION_HOURS
+after they expire, so old links keep answering "booked" / "taken".
+"""
+
+from datetime import datetime, timedelta, time
+
+from app import db
+from app.models.slot import Slot
+from app.models.slot_confirmation import SlotConfirmation
+from app.services.maintenance_service import run_maintenance
+from tests.conftest import add_patient
+
+SUCCESS = "Your appointment is confirmed"
+ALREADY_BOOKED = "You have already booked this appointment"
+TAKEN = "that slot has already been booked"
+INVALID = "This link is invalid or has expired"
+
+
+def test_maintenance_keeps_used_tokens_until_retention(app, client, accounts):
+    with app.app_context():
+        slot = Slot(clinic_id=accounts.clinic_id, doctor_id=accounts.doctor_id,
+                    date=datetime.utcnow().date() + timedelta(days=1),
+                    start_time=time(9), end_time=time(9, 30),
+                    language="English", status="open")
+        db.session.add(slot)
+        db.session.flush()
+        booker, sibling = (
+            SlotConfirmation(slot_id=slot.id, patient_id=add_patient(f"standby{i}@quickdoc.test"),
+                             expires_at=datetime.utcnow() + timedelta(hours=2), used=False)
+            for i in range(2)
+        )
+        db.session.add_all([booker, sibling])
+        db.session.commit()
+        booker_token, sibling_token = booker.token, sibling.token
+
+    assert SUCCESS in client.get(f"/confirm?token={booker_token}").get_data(as_text=True)
+
+    def pages():
+        return [client.get(f"/confirm?token={token}").get_data(as_text=True)
+                for token in (booker_token, sibling_token)]
+
+    retention = timedelta(hours=app.config["TOKEN_RETENTION_HOURS"])
+    # a pass now, and one after the links' 2-hour expiry
+    for now in (datetime.utcnow(), datetime.utcnow() + timedelta(hours=3)):
+        with app.app_context():
+            assert run_maintenance(now)["purged_tokens"] == 0
+        booked_page, sibling_page = pages()
+        assert ALREADY_BOOKED in booked_page
+        assert TAKEN in sibling_page
+
+    # past the retention window they are purged
+    with app.app_context():
+        now = datetime.utcnow() + timedelta(hours=3) + retention
+        assert run_maintenance(now)["purged_tokens"] == 2
+    assert all(INVALID in page for page in pages())
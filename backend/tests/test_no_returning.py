@@ -0,0 +1,86 @@
+# backend/tests/test_no_returning.py
+
+"""
+Booking and schedule generation on a database without RETURNING
+(SQLite before 3.35): the fallbacks give the same results.
+"""
+
+import json
+from datetime import datetime, timedelta, time
+
+import pytest
+
+from app import create_app, db
+from app.models.slot import Slot
+from app.models.slot_confirmation import SlotConfirmation
+from app.models.notification_job import NotificationJob
+from tests.conftest import add_patient
+
+SUCCESS = "Your appointment is confirmed"
+TAKEN = "that slot has already been booked"
+
+
+@pytest.fixture
+def old_sqlite_app(app, client, monkeypatch):
+    """
+    A second app on the same database whose engine behaves like SQLite before
+    3.35. Compiled statements are cached per dialect, so nothing compiled with
+    RETURNING by the shared app leaks into it.
+    """
+    old_app = create_app()
+    old_app.config.update(app.config)
+    old_app.extensions["mail"].suppress = True
+    with old_app.app_context():
+        dialect = db.engine.dialect
+    # what SQLAlchemy's SQLite dialect sets for sqlite_version_info < (3, 35)
+    for flag in ("insert_returning", "update_returning", "delete_returning"):
+        monkeypatch.setattr(dialect, flag, False)
+    return old_app
+
+
+def test_confirmation_invalidates_siblings_without_returning(accounts, old_sqlite_app):
+    app, client = old_sqlite_app, old_sqlite_app.test_client()
+    with app.app_context():
+        slot = Slot(clinic_id=accounts.clinic_id, doctor_id=accounts.doctor_id,
+                    date=datetime.utcnow().date() + timedelta(days=1),
+                    start_time=time(9), end_time=time(9, 30),
+                    language="English", status="open")
+        db.session.add(slot)
+        db.session.flush()
+        confirmations = [
+            SlotConfirmation(slot_id=slot.id, patient_id=add_patient(f"standby{i}@quickdoc.test"),
+                             expires_at=datetime.utcnow() + timedelta(hours=2), used=False)
+            for i in range(3)
+        ]
+        db.session.add_all(confirmations)
+        db.session.commit()
+        slot_id = slot.id
+        tokens = [c.token for c in confirmations]
+        siblings = sorted(c.patient_id for c in confirmations[1:])
+
+    assert SUCCESS in client.get(f"/confirm?token={tokens[0]}").get_data(as_text=True)
+    for token in tokens[1:]:
+        assert TAKEN in client.get(f"/confirm?token={token}").get_data(as_text=True)
+
+    with app.app_context():
+        assert all(c.used for c in SlotConfirmation.query.filter_by(slot_id=slot_id))
+        job = NotificationJob.query.filter_by(kind="slot_taken", slot_id=slot_id).one()
+        assert json.loads(job.payload) == siblings
+
+
+def test_schedule_without_returning(accounts, old_sqlite_app):
+    app, client = old_sqlite_app, old_sqlite_app.test_client()
+    monday = datetime.utcnow().date() + timedelta(days=7 - datetime.utcnow().weekday())
+    r = client.post(f"/api/clinic/doctors/{accounts.doctor_id}/schedule",
+                    headers=accounts.clinic_headers,
+                    json={"weekdays": ["Monday"], "start_time": "09:00", "end_time": "11:00",
+                          "slot_minutes": 30, "date_from": monday.isoformat(),
+                          "date_to": monday.isoformat()})
+    assert r.status_code == 201, r.get_json()
+    assert r.get_json()["created"] == 4
+
+    with app.app_context():
+        slot_ids = sorted(s.id for s in Slot.query.filter_by(doctor_id=accounts.doctor_id))
+        job = NotificationJob.query.filter_by(kind="slots_opened").one()
+        assert len(slot_ids) == 4
+        assert sorted(json.loads(job.payload)) == slot_ids
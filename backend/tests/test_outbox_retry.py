@@ -0,0 +1,93 @@
+# backend/tests/test_outbox_retry.py
+
+"""
+A fan-out where some emails fail is narrowed to those recipients and
+retried with the same confirmation tokens; their daily-cap count is given
+back until the email is actually sent.
+"""
+
+import json
+from datetime import datetime, timedelta, time
+
+from app import db
+from app.models.slot import Slot
+from app.models.standby import StandbyPreference
+from app.models.notification_job import NotificationJob
+from app.models.notification_counter import NotificationCounter
+from app.models.slot_confirmation import SlotConfirmation
+from app.services import notification_service
+from app.services.outbox_service import enqueue_slot_notification, process_outbox
+from app.services.standby_service import index_standby_preference
+from tests.conftest import add_patient
+
+
+def fake_delivery(failing: set, sent: list):
+    """
+    A deliver_messages() stand-in that fails messages to `failing`
+    addresses and records the recipients of the others in `sent`.
+    """
+    def deliver_messages(messages, batch_size=None):
+        failed = [i for i, msg in enumerate(messages) if msg.recipients[0] in failing]
+        sent.extend(msg.recipients[0] for i, msg in enumerate(messages) if i not in failed)
+        return {"sent": len(messages) - len(failed), "failed": len(failed),
+                "failed_indexes": failed, "batches": []}
+    return deliver_messages
+
+
+def daily_count(patient_id):
+    return db.session.query(NotificationCounter.count).filter_by(
+        patient_id=patient_id, day=datetime.utcnow().date()).scalar()
+
+
+def test_failed_recipient_is_retried_alone_with_its_token(app, client, accounts, monkeypatch):
+    emails = ["standby0@quickdoc.test", "standby1@quickdoc.test"]
+    with app.app_context():
+        patient_ids = [add_patient(email) for email in emails]
+        for patient_id in patient_ids:
+            pref = StandbyPreference(patient_id=patient_id, enabled=True,
+                                     preferred_languages="English",
+                                     preferred_times="08:00-18:00",
+                                     max_notifications_per_day=5)
+            index_standby_preference(pref)
+            db.session.add(pref)
+        today = datetime.utcnow().date()
+        slot = Slot(clinic_id=accounts.clinic_id, doctor_id=accounts.doctor_id,
+                    date=today + timedelta(days=7 - today.weekday()),
+                    start_time=time(10), end_time=time(10, 30),
+                    language="English", status="open")
+        db.session.add(slot)
+        db.session.flush()
+        enqueue_slot_notification(slot)
+        db.session.commit()
+        slot_id = slot.id
+    failing_id, delivered_id = patient_ids
+
+    sent = []
+    monkeypatch.setattr(notification_service, "deliver_messages",
+                        fake_delivery({emails[0]}, sent))
+    with app.app_context():
+        assert process_outbox() == {"done": 0, "retried": 1, "dead": 0}
+        assert sent == [emails[1]]
+
+        job = NotificationJob.query.one()
+        token = db.session.query(SlotConfirmation.token).filter_by(
+            slot_id=slot_id, patient_id=failing_id).scalar()
+        assert job.kind == "standby_resend"
+        assert job.status == "pending"
+        assert json.loads(job.payload) == {str(failing_id): [token]}
+        assert daily_count(failing_id) == 0
+        assert daily_count(delivered_id) == 1
+
+        job.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+    sent.clear()
+    monkeypatch.setattr(notification_service, "deliver_messages", fake_delivery(set(), sent))
+    with app.app_context():
+        assert process_outbox() == {"done": 1, "retried": 0, "dead": 0}
+        assert sent == [emails[0]]
+        assert NotificationJob.query.one().status == "done"
+        assert daily_count(failing_id) == 1
+        assert daily_count(delivered_id) == 1
+        # the resend reused the stored token instead of creating another
+        assert SlotConfirmation.query.filter_by(patient_id=failing_id).count() == 1
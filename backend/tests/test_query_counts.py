@@ -0,0 +1,111 @@
+# backend/tests/test_query_counts.py
+
+"""
+Each list endpoint issues a fixed number of SQL statements, however many
+rows it returns: related doctors, clinics and slots are eager-loaded
+instead of lazy-loaded once per row (N+1).
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta, time
+
+from sqlalchemy import event
+from app import db
+from app.models.slot import Slot
+from app.models.doctor import Doctor
+from app.models.booking import Booking
+
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def add_rows(accounts, count: int, first_day: int):
+    """
+    `count` days, each with a new doctor of the accounts' clinic and an
+    open, a booked and a cancelled slot of theirs; the booked one belongs
+    to the accounts' patient. One doctor per day, so lazy loads could not
+    be served from the session's identity map. The accounts' own doctor
+    gets an open slot a day as well.
+    """
+    today = datetime.utcnow().date()
+    for day in range(first_day, first_day + count):
+        date = today + timedelta(days=day + 1)
+        doctor = Doctor(clinic_id=accounts.clinic_id, name=f"Dr. Day {day}",
+                        specialization="Dentist", languages="English")
+        db.session.add(doctor)
+        db.session.flush()
+        slots = {
+            status: Slot(clinic_id=accounts.clinic_id, doctor_id=doctor.id,
+                         date=date, start_time=time(hour), end_time=time(hour, 30),
+                         language="English", specialization="Dentist", status=status)
+            for hour, status in ((9, "open"), (10, "booked"), (11, "cancelled"))
+        }
+        db.session.add_all(slots.values())
+        db.session.add(Slot(clinic_id=accounts.clinic_id, doctor_id=accounts.doctor_id,
+                            date=date, start_time=time(12), end_time=time(12, 30),
+                            language="English", status="open"))
+        db.session.flush()
+        db.session.add(Booking(patient_id=accounts.patient_id, slot_id=slots["booked"].id))
+    db.session.commit()
+
+
+def list_endpoints(accounts):
+    patient, clinic = accounts.patient_headers, accounts.clinic_headers
+    return [
+        ("/api/patient/slots", patient),
+        ("/api/patient/appointments", patient),
+        ("/api/patient/history", patient),
+        ("/api/clinic/slots", clinic),
+        ("/api/clinic/bookings", clinic),
+        ("/api/clinic/cancellations", clinic),
+        ("/api/clinic/doctors", clinic),
+        (f"/api/clinic/doctors/{accounts.doctor_id}/slots", clinic),
+    ]
+
+
+def measure(app, client, accounts):
+    """
+    {url: (statements, rows returned)} for every list endpoint.
+    """
+    with app.app_context():
+        engine = db.engine
+
+    results = {}
+    for url, headers in list_endpoints(accounts):
+        # warm the per-process user cache so only the listing itself is counted
+        client.get(url, headers=headers, buffered=True)
+        with count_statements(engine) as statements:
+            r = client.get(url, headers=headers, buffered=True)
+        assert r.status_code == 200, (url, r.get_json())
+        results[url] = (len(statements), len(r.get_json()))
+    return results
+
+
+def test_list_endpoint_query_counts_do_not_grow_with_rows(app, client, accounts):
+    with app.app_context():
+        add_rows(accounts, 2, first_day=0)
+    small = measure(app, client, accounts)
+
+    with app.app_context():
+        add_rows(accounts, 8, first_day=2)
+    large = measure(app, client, accounts)
+
+    for url, _ in list_endpoints(accounts):
+        small_statements, small_rows = small[url]
+        large_statements, large_rows = large[url]
+        assert large_rows > small_rows, url
+        assert large_statements == small_statements, (
+            f"{url}: {small_statements} statements for {small_rows} rows, "
+            f"{large_statements} for {large_rows}"
+        )
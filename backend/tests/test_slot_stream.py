@@ -0,0 +1,114 @@
+# backend/tests/test_slot_stream.py
+
+"""
+The live slot stream: its in-memory filter agrees with the SQL search, and
+a subscriber that falls behind is sent `reset` and dropped.
+"""
+
+from datetime import datetime, timedelta, time
+
+from app import db
+from app.models.user import Clinic
+from app.models.doctor import Doctor
+from app.models.slot import Slot
+from app.services.slot_service import open_slots_query
+from app.services.slot_stream_service import (
+    Subscriber, broker, slot_event_matches, stream_slot_events, _slot_events
+)
+from app.services.auth_service import hash_password
+
+
+def add_slots(accounts):
+    """
+    Open and non-open slots across two clinics (cities), two doctors,
+    languages, specializations, days and hours. Returns all slot ids.
+    """
+    other = Clinic(email="munich@quickdoc.test", password_hash=hash_password("x"),
+                   name="Munich Clinic", city="Munich")
+    db.session.add(other)
+    db.session.flush()
+    doctors = [
+        (accounts.clinic_id, accounts.doctor_id),
+        (other.id, None),
+    ]
+    doctor = Doctor(clinic_id=other.id, name="Dr. Müller-Weiss", specialization="Cardiologist")
+    db.session.add(doctor)
+    db.session.flush()
+    doctors[1] = (other.id, doctor.id)
+
+    today = datetime.utcnow().date()
+    slots = []
+    for i in range(24):
+        clinic_id, doctor_id = doctors[i % 2]
+        slots.append(Slot(
+            clinic_id=clinic_id,
+            doctor_id=doctor_id if i % 3 else None,
+            date=today + timedelta(days=1 + i % 4),
+            start_time=time(8 + i % 6), end_time=time(9 + i % 6),
+            language=["English", "german", "Turkish"][i % 3],
+            specialization=["Dentist", "Cardiologist", None][i % 3],
+            status="open" if i % 5 else "booked",
+        ))
+    db.session.add_all(slots)
+    db.session.commit()
+    return [slot.id for slot in slots], doctor.id
+
+
+def test_slot_event_matches_agrees_with_open_slots_query(app, client, accounts):
+    today = datetime.utcnow().date()
+    with app.app_context():
+        slot_ids, munich_doctor_id = add_slots(accounts)
+        filter_sets = [
+            {},
+            {"language": "GERMAN"},
+            {"specialization": "dentist"},
+            {"city": "munich"},
+            {"doctor_id": munich_doctor_id},
+            {"doctor_name": "müller"},
+            {"doctor_name": "test"},
+            {"date_from": today + timedelta(days=2)},
+            {"date_to": today + timedelta(days=2)},
+            {"time_from": time(10)},
+            {"time_to": time(11)},
+            {"language": "english", "city": "Berlin", "date_from": today + timedelta(days=1),
+             "date_to": today + timedelta(days=3), "time_from": time(8), "time_to": time(13)},
+        ]
+        events = [event["slot"] for event in _slot_events(db.session, slot_ids)
+                  if event["slot"]["status"] == "open"]
+
+        for filters in filter_sets:
+            expected = {slot.id for slot in open_slots_query(**filters)}
+            matched = {slot["id"] for slot in events if slot_event_matches(filters, slot)}
+            assert matched == expected, filters
+            assert expected, f"{filters} matches no slot; the comparison proves nothing"
+
+
+def test_removed_slots_go_to_every_subscriber():
+    assert slot_event_matches({"language": "German", "city": "Berlin"}, {"id": 7})
+
+
+def test_overflowing_subscriber_gets_reset_and_is_dropped():
+    subscriber = broker.subscribe({}, queue_size=2, max_subscribers=10)
+    try:
+        for n in range(4):
+            subscriber.offer(f"event: slot.opened\ndata: {n}\n\n")
+        assert subscriber.overflowed
+
+        frames = list(stream_slot_events(subscriber, heartbeat_seconds=1))
+        # the oldest frame made room for the reset marker; later ones were dropped
+        assert frames == [
+            "retry: 1000\n\n",
+            "event: slot.opened\ndata: 1\n\n",
+            "event: reset\ndata: {}\n\n",
+        ]
+        assert subscriber not in broker.subscribers
+    finally:
+        broker.unsubscribe(subscriber)
+
+
+def test_subscriber_within_its_queue_size_is_not_reset():
+    subscriber = Subscriber({}, queue_size=3)
+    for n in range(3):
+        subscriber.offer(f"data: {n}\n\n")
+    assert not subscriber.overflowed
+    assert [subscriber.queue.get_nowait() for _ in range(3)] == [f"data: {n}\n\n" for n in range(3)]
@@ -34,6 +34,7 @@ export default function PatientDashboard() {
   const [stats, setStats] = useState({ total: 0, upcoming: 0, completed: 0 });
   const [filters, setFilters] = useState({ doctor: '', specialty: '', city: '', lang: '' });
   const [slots, setSlots] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [bookings, setBookings] = useState([]);
   const [history, setHistory] = useState([]);
 
@@ -75,9 +76,17 @@ export default function PatientDashboard() {
     });
   }, []);
 
+  // Slots come one page at a time; X-Next-Cursor points at the next page
+  const loadSlots = (cursor = null) =>
+    api.get('/patient/slots', { params: cursor ? { ...filters, cursor } : filters })
+      .then(res => {
+        setSlots(prev => (cursor ? [...prev, ...res.data] : res.data));
+        setNextCursor(res.headers['x-next-cursor'] || null);
+      });
+
   // Fetch slots when filters change
   useEffect(() => {
-    api.get('/patient/slots', { params: filters }).then(res => setSlots(res.data));
+    loadSlots();
   }, [filters]);
 
     const saveStandby = () => {
@@ -114,7 +123,7 @@ export default function PatientDashboard() {
       .catch(() => alert('Booking failed'));
 
   const refreshAppointments = () => api.get('/patient/appointments').then(res => setBookings(res.data));
-  const refreshSlots        = () => api.get('/patient/slots', { params: filters }).then(res => setSlots(res.data));
+  const refreshSlots        = () => loadSlots();
 
   const isFiltering = Boolean(filters.doctor || filters.specialty || filters.city || filters.lang);
 
@@ -178,7 +187,7 @@ export default function PatientDashboard() {
               <StatCard icon={<FaChartLine />}   label="Total Visits"    value={stats.total} />
               <StatCard icon={<FaCalendarAlt />} label="Upcoming"        value={stats.upcoming} />
               <StatCard icon={<FaUserMd />}      label="Completed"       value={stats.completed} />
-              <StatCard icon={<FaBookOpen />}    label="Slots Available" value={slots.length} />
+              <StatCard icon={<FaBookOpen />}    label="Slots Available" value={nextCursor ? `${slots.length}+` : slots.length} />
             </div>
 
             {/* Search & Slots */}
@@ -205,7 +214,14 @@ export default function PatientDashboard() {
                 onChange={val => setFilters(f => ({ ...f, specialty: val }))}
               />
             </div>
-            {isFiltering && <SlotsTable slots={slots} onBook={bookSlot} />}
+            {isFiltering && (
+              <SlotsTable
+                slots={slots}
+                onBook={bookSlot}
+                hasMore={Boolean(nextCursor)}
+                onLoadMore={() => loadSlots(nextCursor)}
+              />
+            )}
 
             {/* Bookings & History */}
             <div className="grid grid-cols-10 gap-6">
@@ -501,7 +517,7 @@ function InputWithIcon({ icon, placeholder, value, onChange }) {
   );
 }
 
-function SlotsTable({ slots, onBook }) {
+function SlotsTable({ slots, onBook, hasMore, onLoadMore }) {
   return (
     <div className="bg-white rounded-xl border border-gray-200 overflow-x-auto">
       <h2 className="text-2xl font-semibold px-6 py-4">Available Slots</h2>
@@ -532,6 +548,13 @@ function SlotsTable({ slots, onBook }) {
           )}  
         </tbody>
       </table>
+      {hasMore && (
+        <div className="px-6 py-4 text-center">
+          <button onClick={onLoadMore} className="text-blue-600 hover:underline text-sm">
+            Load more slots
+          </button>
+        </div>
+      )}
     </div>
   );
 }